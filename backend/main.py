@@ -13,6 +13,7 @@ from src.backend.api.routes.chat import router as chat_router
 from src.backend.core.config import get_settings
 from src.backend.core.config.rag_config import get_rag_config
 from src.backend.core.error_handling.circuit_breaker import get_circuit_breaker_manager
+from src.backend.core.error_handling.error_intervention_manager import get_error_intervention_manager
 from src.backend.core.services.enhanced_rag_service import get_enhanced_rag_service
 
 # Configure logging
@@ -35,6 +36,10 @@ async def graceful_shutdown():
         await circuit_manager.reset_all()
         logger.info("Circuit breakers reset")
         
+        # Flush intervention tasks still queued for the background writer
+        await get_error_intervention_manager().close()
+        logger.info("Intervention task writes flushed")
+        
         # Add any other cleanup tasks here
         # e.g., close database connections, save pending data, etc.
         
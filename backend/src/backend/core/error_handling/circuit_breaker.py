@@ -1,21 +1,42 @@
 """Circuit breaker implementation for AI processing failures."""
 import asyncio
 import logging
-from typing import Dict, Any, Optional, Callable, Awaitable
-from datetime import datetime, timedelta
-from enum import Enum
+import sys
+import threading
+from typing import Deque, Dict, Any, Mapping, Optional, Callable, Awaitable
+from collections import deque
+from datetime import datetime, timezone
+from enum import IntEnum
 from dataclasses import dataclass
 import time
+from types import MappingProxyType
 
 logger = logging.getLogger(__name__)
 
-class CircuitState(str, Enum):
-    """Circuit breaker states."""
-    CLOSED = "closed"      # Normal operation
-    OPEN = "open"          # Circuit is open, failing fast
-    HALF_OPEN = "half_open"  # Testing if service is recovered
+if sys.version_info >= (3, 11):
+    async def run_with_timeout(awaitable: Awaitable[Any], timeout: float) -> Any:
+        """Await with a deadline, without wrapping the awaitable in a new Task."""
+        async with asyncio.timeout(timeout):
+            return await awaitable
+else:
+    async def run_with_timeout(awaitable: Awaitable[Any], timeout: float) -> Any:
+        """Await with a deadline (asyncio.timeout is unavailable before 3.11)."""
+        return await asyncio.wait_for(awaitable, timeout=timeout)
 
-@dataclass
+class CircuitState(IntEnum):
+    """Circuit breaker states.
+    
+    Stored as ints so the state checks on every call are plain int compares;
+    use ``_STATE_NAMES`` for the external string form.
+    """
+    CLOSED = 0      # Normal operation
+    OPEN = 1        # Circuit is open, failing fast
+    HALF_OPEN = 2   # Testing if service is recovered
+
+# External (JSON) names, indexed by CircuitState value
+_STATE_NAMES = ("closed", "open", "half_open")
+
+@dataclass(slots=True, frozen=True)
 class CircuitBreakerConfig:
     """Configuration for circuit breaker."""
     failure_threshold: int = 5          # Number of failures before opening
@@ -31,6 +52,13 @@ class CircuitBreakerError(Exception):
 class CircuitBreaker:
     """Circuit breaker for protecting against cascading failures."""
     
+    __slots__ = (
+        "name", "config", "state", "failure_count", "success_count",
+        "_wall_anchor", "_last_failure_mono", "_last_success_mono",
+        "failure_times", "_open_until", "_state_cache", "_config_dict",
+        "_last_failure_iso", "_last_success_iso", "_lock"
+    )
+    
     def __init__(self, name: str, config: Optional[CircuitBreakerConfig] = None):
         """Initialize circuit breaker."""
         self.name = name
@@ -38,21 +66,43 @@ class CircuitBreaker:
         self.state = CircuitState.CLOSED
         self.failure_count = 0
         self.success_count = 0
-        self.last_failure_time: Optional[datetime] = None
-        self.last_success_time: Optional[datetime] = None
-        self.failure_times: list = []
-        self._lock = asyncio.Lock()
+        # Event times are tracked on the monotonic clock; wall-clock values
+        # are derived from a single anchor taken here, only when reported
+        self._wall_anchor = time.time() - time.monotonic()
+        self._last_failure_mono: Optional[float] = None
+        self._last_success_mono: Optional[float] = None
+        # Monotonic timestamps of failures inside the rolling window, oldest first
+        self.failure_times: Deque[float] = deque()
+        # Monotonic deadline after which an OPEN circuit may probe HALF_OPEN
+        self._open_until: float = 0.0
+        # Snapshot get_state() copies from, dropped whenever a reported field
+        # other than last_success_time changes
+        self._state_cache: Optional[Dict[str, Any]] = None
+        # Static part of get_state(), shared read-only by every snapshot
+        self._config_dict: Mapping[str, Any] = MappingProxyType({
+            "failure_threshold": self.config.failure_threshold,
+            "recovery_timeout": self.config.recovery_timeout,
+            "success_threshold": self.config.success_threshold,
+            "timeout_seconds": self.config.timeout_seconds,
+            "rolling_window_seconds": self.config.rolling_window_seconds
+        })
+        self._last_failure_iso: Optional[str] = None
+        self._last_success_iso: Optional[str] = None
+        # Critical sections never await, so a plain mutex is enough
+        self._lock = threading.Lock()
     
     async def call(self, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
         """Execute function with circuit breaker protection."""
-        async with self._lock:
-            # Check if we should transition to half-open
-            if (self.state == CircuitState.OPEN and 
-                self.last_failure_time and
-                datetime.utcnow() - self.last_failure_time >= timedelta(seconds=self.config.recovery_timeout)):
-                self.state = CircuitState.HALF_OPEN
-                self.success_count = 0
-                logger.info(f"Circuit breaker {self.name} transitioning to HALF_OPEN")
+        # Only an OPEN circuit whose recovery deadline has passed needs the
+        # lock; the CLOSED and HALF_OPEN paths read the state without it
+        if self.state == CircuitState.OPEN and time.monotonic() >= self._open_until:
+            with self._lock:
+                # Re-check: another caller may have transitioned already
+                if self.state == CircuitState.OPEN and time.monotonic() >= self._open_until:
+                    self.state = CircuitState.HALF_OPEN
+                    self.success_count = 0
+                    self._state_cache = None
+                    logger.info(f"Circuit breaker {self.name} transitioning to HALF_OPEN")
         
         # Fail fast if circuit is open
         if self.state == CircuitState.OPEN:
@@ -61,84 +111,140 @@ class CircuitBreaker:
         
         try:
             # Execute with timeout
-            result = await asyncio.wait_for(
+            result = await run_with_timeout(
                 func(*args, **kwargs),
-                timeout=self.config.timeout_seconds
+                self.config.timeout_seconds
             )
             
             # Record success
-            await self._on_success()
+            self._on_success()
             return result
             
         except Exception as e:
             # Record failure
-            await self._on_failure(e)
+            self._on_failure(e)
             raise
     
-    async def _on_success(self):
+    def _on_success(self):
         """Handle successful operation."""
-        async with self._lock:
-            self.last_success_time = datetime.utcnow()
-            
+        self._last_success_mono = time.monotonic()
+        # Only the success time changed so far; get_state() refreshes that
+        # one field in the snapshot instead of rebuilding it
+        self._last_success_iso = None
+        
+        # No state transition can happen from CLOSED, so the common
+        # success path never takes the lock
+        if self.state == CircuitState.CLOSED:
+            # Reset failure count on success in closed state
+            if self.failure_count > 0:
+                self.failure_count -= 1
+                self._state_cache = None
+            return
+        
+        with self._lock:
             if self.state == CircuitState.HALF_OPEN:
+                self._state_cache = None
                 self.success_count += 1
                 if self.success_count >= self.config.success_threshold:
                     self.state = CircuitState.CLOSED
                     self.failure_count = 0
                     self.failure_times.clear()
                     logger.info(f"Circuit breaker {self.name} transitioning to CLOSED")
-            elif self.state == CircuitState.CLOSED:
-                # Reset failure count on success in closed state
-                self.failure_count = max(0, self.failure_count - 1)
     
-    async def _on_failure(self, error: Exception):
+    def _on_failure(self, error: Exception):
         """Handle failed operation."""
-        async with self._lock:
-            current_time = datetime.utcnow()
-            self.last_failure_time = current_time
-            self.failure_times.append(current_time)
-            
-            # Clean old failure times outside rolling window
-            cutoff_time = current_time - timedelta(seconds=self.config.rolling_window_seconds)
-            self.failure_times = [t for t in self.failure_times if t > cutoff_time]
-            
-            self.failure_count = len(self.failure_times)
+        now = time.monotonic()
+        cutoff = now - self.config.rolling_window_seconds
+        opened = False
+        
+        # Keep the critical section to the bookkeeping itself
+        with self._lock:
+            failure_times = self.failure_times
+            failure_times.append(now)
+            # Drop failure times that fell out of the rolling window
+            while failure_times and failure_times[0] <= cutoff:
+                failure_times.popleft()
+            failure_count = self.failure_count = len(failure_times)
+            self._last_failure_mono = now
+            self._last_failure_iso = None
+            self._state_cache = None
             
             # Check if we should open the circuit
-            if (self.state in [CircuitState.CLOSED, CircuitState.HALF_OPEN] and
-                self.failure_count >= self.config.failure_threshold):
+            if (self.state != CircuitState.OPEN and
+                failure_count >= self.config.failure_threshold):
                 self.state = CircuitState.OPEN
-                logger.error(
-                    f"Circuit breaker {self.name} transitioning to OPEN after {self.failure_count} failures"
-                )
+                opened = True
+            
+            # Recovery is measured from the most recent failure
+            if self.state == CircuitState.OPEN:
+                self._open_until = now + self.config.recovery_timeout
+        
+        if opened:
+            logger.error(
+                f"Circuit breaker {self.name} transitioning to OPEN after {failure_count} failures"
+            )
+    
+    @property
+    def last_failure_time(self) -> Optional[datetime]:
+        """Wall-clock time of the most recent failure."""
+        return self._to_datetime(self._last_failure_mono)
+    
+    @property
+    def last_success_time(self) -> Optional[datetime]:
+        """Wall-clock time of the most recent success."""
+        return self._to_datetime(self._last_success_mono)
+    
+    def _to_datetime(self, mono: Optional[float]) -> Optional[datetime]:
+        """Convert a monotonic timestamp to an aware UTC datetime."""
+        if mono is None:
+            return None
+        return datetime.fromtimestamp(self._wall_anchor + mono, tz=timezone.utc)
+    
+    def _to_iso(self, mono: Optional[float]) -> Optional[str]:
+        dt = self._to_datetime(mono)
+        return dt.isoformat() if dt else None
     
     def get_state(self) -> Dict[str, Any]:
         """Get current circuit breaker state."""
+        state = self._state_cache
+        if state is None:
+            state = self._state_cache = self._build_state()
+        elif self._last_success_iso is None and self._last_success_mono is not None:
+            self._last_success_iso = self._to_iso(self._last_success_mono)
+            state["last_success_time"] = self._last_success_iso
+        # A shallow copy, so callers cannot alter the snapshot; the nested
+        # config is read-only
+        return dict(state)
+    
+    def _build_state(self) -> Dict[str, Any]:
+        # Only timestamps that changed since the last snapshot are re-formatted
+        if self._last_failure_iso is None:
+            self._last_failure_iso = self._to_iso(self._last_failure_mono)
+        if self._last_success_iso is None:
+            self._last_success_iso = self._to_iso(self._last_success_mono)
         return {
             "name": self.name,
-            "state": self.state.value,
+            "state": _STATE_NAMES[self.state],
             "failure_count": self.failure_count,
             "success_count": self.success_count,
-            "last_failure_time": self.last_failure_time.isoformat() if self.last_failure_time else None,
-            "last_success_time": self.last_success_time.isoformat() if self.last_success_time else None,
-            "config": {
-                "failure_threshold": self.config.failure_threshold,
-                "recovery_timeout": self.config.recovery_timeout,
-                "success_threshold": self.config.success_threshold,
-                "timeout_seconds": self.config.timeout_seconds,
-                "rolling_window_seconds": self.config.rolling_window_seconds
-            }
+            "last_failure_time": self._last_failure_iso,
+            "last_success_time": self._last_success_iso,
+            "config": self._config_dict
         }
     
-    async def reset(self):
+    def reset(self):
         """Reset circuit breaker to closed state."""
-        async with self._lock:
+        with self._lock:
             self.state = CircuitState.CLOSED
             self.failure_count = 0
             self.success_count = 0
             self.failure_times.clear()
-            self.last_failure_time = None
-            self.last_success_time = None
+            self._last_failure_mono = None
+            self._last_success_mono = None
+            self._last_failure_iso = None
+            self._last_success_iso = None
+            self._open_until = 0.0
+            self._state_cache = None
             logger.info(f"Circuit breaker {self.name} manually reset to CLOSED")
 
 class CircuitBreakerManager:
@@ -151,18 +257,29 @@ class CircuitBreakerManager:
     
     def get_breaker(self, name: str, config: Optional[CircuitBreakerConfig] = None) -> CircuitBreaker:
         """Get or create a circuit breaker."""
-        if name not in self.breakers:
-            self.breakers[name] = CircuitBreaker(name, config or self.default_config)
-        return self.breakers[name]
+        breaker = self.breakers.get(name)
+        if breaker is None:
+            # setdefault keeps the first breaker if a concurrent caller won the race
+            breaker = self.breakers.setdefault(
+                name, CircuitBreaker(name, config or self.default_config)
+            )
+        return breaker
     
     def get_all_states(self) -> Dict[str, Dict[str, Any]]:
         """Get states of all circuit breakers."""
         return {name: breaker.get_state() for name, breaker in self.breakers.items()}
     
+    def count_by_state(self) -> Dict[str, int]:
+        """Count circuit breakers per state without building full snapshots."""
+        counts = [0] * len(_STATE_NAMES)
+        for breaker in self.breakers.values():
+            counts[breaker.state] += 1
+        return dict(zip(_STATE_NAMES, counts))
+    
     async def reset_all(self):
         """Reset all circuit breakers."""
-        for breaker in self.breakers.values():
-            await breaker.reset()
+        for breaker in list(self.breakers.values()):
+            breaker.reset()
         logger.info("All circuit breakers reset")
 
 # Global circuit breaker manager
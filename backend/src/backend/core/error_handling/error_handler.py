@@ -1,10 +1,16 @@
 """Error handling and manual intervention system for document analysis."""
 import logging
 import asyncio
+import itertools
+import sys
+import time
+import traceback
 from typing import Dict, List, Optional, Any, Tuple
-from datetime import datetime, timedelta
+from collections import OrderedDict, defaultdict, deque
+from datetime import datetime, timezone
 from enum import Enum
-from dataclasses import dataclass
+from functools import cache
+from dataclasses import dataclass, field, replace
 from pathlib import Path
 
 from ...exceptions.analysis_exceptions import (
@@ -22,21 +28,68 @@ from ...exceptions.analysis_exceptions import (
 
 logger = logging.getLogger(__name__)
 
-class InterventionPriority(Enum):
+class InterventionPriority(str, Enum):
     """Priority levels for manual intervention tasks."""
     LOW = "low"
     MEDIUM = "medium"
     HIGH = "high"
     CRITICAL = "critical"
 
-class InterventionStatus(Enum):
+class InterventionStatus(str, Enum):
     """Status of manual intervention tasks."""
     PENDING = "pending"
     IN_PROGRESS = "in_progress"
     RESOLVED = "resolved"
     DISMISSED = "dismissed"
 
-@dataclass
+@dataclass(frozen=True, slots=True)
+class ErrorPattern:
+    """Handling strategy for a known error code."""
+    priority: InterventionPriority
+    auto_retry: bool
+    escalation_threshold: int
+    resolution_steps: Tuple[str, ...]
+    effort: str
+
+# Upper bounds on retained records. The oldest failure reports are evicted
+# first; intervention tasks are only evicted once closed, and new tasks are
+# refused while the limit is filled with open work.
+MAX_FAILURE_REPORTS = 50_000
+MAX_INTERVENTION_TASKS = 10_000
+# Fill ratio at which a background cleanup of old records is scheduled, if
+# the oldest report is already past the retention period
+CLEANUP_HIGH_WATER_RATIO = 0.8
+RECORD_RETENTION_DAYS = 30
+
+# Intervention statuses that no longer need attention
+_CLOSED_STATUSES = frozenset({InterventionStatus.RESOLVED, InterventionStatus.DISMISSED})
+
+# Window (in seconds) used when counting recent failures for escalation
+ESCALATION_WINDOW_SECONDS = 24 * 60 * 60
+
+# Strategy applied to error codes without a registered pattern
+_DEFAULT_PATTERN = ErrorPattern(
+    priority=InterventionPriority.MEDIUM,
+    auto_retry=False,
+    escalation_threshold=1,
+    resolution_steps=(),
+    effort="30-60 minutes"
+)
+
+# Process-wide sequence backing failure report and intervention task IDs
+_id_counter = itertools.count()
+
+def _next_id(prefix: str) -> str:
+    """Generate a process-unique, prefixed identifier."""
+    return f"{prefix}-{next(_id_counter):016x}-{int(time.time())}"
+
+def _format_active_exception() -> Optional[str]:
+    """Format the exception currently being handled, if there is one."""
+    if sys.exc_info()[0] is None:
+        return None
+    return traceback.format_exc()
+
+@dataclass(slots=True)
 class FailureReport:
     """Detailed failure report for analysis operations."""
     error_id: str
@@ -45,13 +98,28 @@ class FailureReport:
     message: str
     file_path: Optional[str]
     details: Dict[str, Any]
-    timestamp: datetime
+    ts_epoch: float
     stack_trace: Optional[str]
     attempted_tools: List[str]
     fallback_exhausted: bool
+    _dict_cache: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
+    
+    @property
+    def timestamp(self) -> datetime:
+        """Time the failure was recorded, as an aware UTC datetime."""
+        return datetime.fromtimestamp(self.ts_epoch, tz=timezone.utc)
+    
+    def invalidate_cache(self) -> None:
+        """Drop the cached dictionary form after a mutation."""
+        self._dict_cache = None
     
     def to_dict(self) -> Dict[str, Any]:
-        """Convert failure report to dictionary."""
+        """Convert failure report to dictionary (a copy of the cached form)."""
+        if self._dict_cache is None:
+            self._dict_cache = self._build_dict()
+        return dict(self._dict_cache)
+    
+    def _build_dict(self) -> Dict[str, Any]:
         return {
             "error_id": self.error_id,
             "error_type": self.error_type,
@@ -65,26 +133,43 @@ class FailureReport:
             "fallback_exhausted": self.fallback_exhausted
         }
 
-@dataclass
+@dataclass(slots=True)
 class InterventionTask:
     """Manual intervention task details."""
     task_id: str
     failure_report: FailureReport
     priority: InterventionPriority
     status: InterventionStatus
-    created_at: datetime
+    created_epoch: float
     assigned_to: Optional[str]
     notes: List[str]
     resolution_steps: List[str]
     estimated_effort: Optional[str]
+    _dict_cache: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
+    
+    @property
+    def created_at(self) -> datetime:
+        """Time the task was created, as an aware UTC datetime."""
+        return datetime.fromtimestamp(self.created_epoch, tz=timezone.utc)
+    
+    def invalidate_cache(self) -> None:
+        """Drop the cached dictionary form after a mutation."""
+        self._dict_cache = None
     
     def to_dict(self) -> Dict[str, Any]:
-        """Convert intervention task to dictionary."""
+        """Convert intervention task to dictionary (a copy of the cached form)."""
+        if self._dict_cache is None:
+            self._dict_cache = self._build_dict()
+        # The report is filled in on every call, so the task's cache never
+        # holds a stale copy of a report that changed after it was built
+        return {**self._dict_cache, "failure_report": self.failure_report.to_dict()}
+    
+    def _build_dict(self) -> Dict[str, Any]:
         return {
             "task_id": self.task_id,
-            "failure_report": self.failure_report.to_dict(),
-            "priority": self.priority.value,
-            "status": self.status.value,
+            "failure_report": None,
+            "priority": self.priority,
+            "status": self.status,
             "created_at": self.created_at.isoformat(),
             "assigned_to": self.assigned_to,
             "notes": self.notes,
@@ -97,83 +182,96 @@ class AnalysisFailureHandler:
     
     def __init__(self):
         """Initialize the failure handler."""
-        self.intervention_tasks: Dict[str, InterventionTask] = {}
-        self.failure_reports: Dict[str, FailureReport] = {}
-        self._error_patterns: Dict[str, Dict[str, Any]] = {}
+        self.intervention_tasks: Dict[str, InterventionTask] = OrderedDict()
+        # Ids of resolved or dismissed tasks, in the order they were closed
+        self._closed_task_ids: Dict[str, None] = OrderedDict()
+        self.failure_reports: Dict[str, FailureReport] = OrderedDict()
+        self._cleanup_task: Optional[asyncio.Task] = None
+        self._error_patterns: Dict[str, ErrorPattern] = {}
+        # Per error code epoch timestamps within the escalation window, oldest first
+        self._recent_by_code: Dict[str, deque] = defaultdict(deque)
         self._initialize_error_patterns()
     
     def _initialize_error_patterns(self) -> None:
         """Initialize known error patterns and their handling strategies."""
         self._error_patterns = {
-            "TOOL_INIT_ERROR": {
-                "priority": InterventionPriority.HIGH,
-                "auto_retry": False,
-                "escalation_threshold": 1,
-                "resolution_steps": [
+            "TOOL_INIT_ERROR": ErrorPattern(
+                priority=InterventionPriority.HIGH,
+                auto_retry=False,
+                escalation_threshold=1,
+                resolution_steps=(
                     "Check tool dependencies and installation",
                     "Verify API keys and credentials",
                     "Review tool configuration parameters",
                     "Test with minimal example file"
-                ]
-            },
-            "FILE_ACCESS_ERROR": {
-                "priority": InterventionPriority.MEDIUM,
-                "auto_retry": True,
-                "escalation_threshold": 3,
-                "resolution_steps": [
+                ),
+                effort="30-60 minutes"
+            ),
+            "FILE_ACCESS_ERROR": ErrorPattern(
+                priority=InterventionPriority.MEDIUM,
+                auto_retry=True,
+                escalation_threshold=3,
+                resolution_steps=(
                     "Verify file exists and is readable",
                     "Check file permissions",
                     "Validate file path format",
                     "Test with different file location"
-                ]
-            },
-            "UNSUPPORTED_FILE_TYPE": {
-                "priority": InterventionPriority.LOW,
-                "auto_retry": False,
-                "escalation_threshold": 1,
-                "resolution_steps": [
+                ),
+                effort="15-30 minutes"
+            ),
+            "UNSUPPORTED_FILE_TYPE": ErrorPattern(
+                priority=InterventionPriority.LOW,
+                auto_retry=False,
+                escalation_threshold=1,
+                resolution_steps=(
                     "Confirm file extension is supported",
                     "Check if file conversion is possible",
                     "Update supported file types if needed",
                     "Document limitation for user reference"
-                ]
-            },
-            "LLM_API_ERROR": {
-                "priority": InterventionPriority.HIGH,
-                "auto_retry": True,
-                "escalation_threshold": 2,
-                "resolution_steps": [
+                ),
+                effort="5-15 minutes"
+            ),
+            "LLM_API_ERROR": ErrorPattern(
+                priority=InterventionPriority.HIGH,
+                auto_retry=True,
+                escalation_threshold=2,
+                resolution_steps=(
                     "Check API key validity and quotas",
                     "Verify network connectivity",
                     "Review rate limiting policies",
                     "Consider alternative LLM providers"
-                ]
-            },
-            "PROCESSING_TIMEOUT": {
-                "priority": InterventionPriority.MEDIUM,
-                "auto_retry": True,
-                "escalation_threshold": 2,
-                "resolution_steps": [
+                ),
+                effort="15-45 minutes"
+            ),
+            "PROCESSING_TIMEOUT": ErrorPattern(
+                priority=InterventionPriority.MEDIUM,
+                auto_retry=True,
+                escalation_threshold=2,
+                resolution_steps=(
                     "Check file size and complexity",
                     "Increase timeout parameters",
                     "Consider file preprocessing",
                     "Optimize processing pipeline"
-                ]
-            },
-            "FALLBACK_EXHAUSTION": {
-                "priority": InterventionPriority.CRITICAL,
-                "auto_retry": False,
-                "escalation_threshold": 1,
-                "resolution_steps": [
+                ),
+                effort="20-40 minutes"
+            ),
+            "FALLBACK_EXHAUSTION": ErrorPattern(
+                priority=InterventionPriority.CRITICAL,
+                auto_retry=False,
+                escalation_threshold=1,
+                resolution_steps=(
                     "Review all attempted tools and errors",
                     "Check if new tools are available",
                     "Consider manual processing approach",
                     "Escalate to development team"
-                ]
-            }
+                ),
+                effort="60-120 minutes"
+            ),
+            # No dedicated handling strategy, but a known effort estimate
+            "CONFIGURATION_ERROR": replace(_DEFAULT_PATTERN, effort="10-30 minutes"),
         }
     
-    async def handle_failure(
+    def handle_failure(
         self, 
         error: Exception, 
         file_path: Optional[str] = None,
@@ -181,16 +279,15 @@ class AnalysisFailureHandler:
         context: Optional[Dict[str, Any]] = None
     ) -> FailureReport:
         """Handle an analysis failure and create appropriate reports."""
-        import traceback
-        import uuid
-        
         # Generate unique error ID
-        error_id = str(uuid.uuid4())
+        error_id = _next_id("err")
         
         # Extract error information
         if isinstance(error, DocumentAnalysisError):
             error_type = error.__class__.__name__
-            error_code = error.error_code
+            # Codes key several per-code tables; interning makes each lookup
+            # hit the identity fast path against the literal pattern keys
+            error_code = sys.intern(error.error_code)
             message = error.message
             details = error.details
             file_path = file_path or error.file_path
@@ -208,18 +305,18 @@ class AnalysisFailureHandler:
             message=message,
             file_path=file_path,
             details=details,
-            timestamp=datetime.utcnow(),
-            stack_trace=traceback.format_exc(),
+            ts_epoch=time.time(),
+            stack_trace=None,
             attempted_tools=attempted_tools or [],
             fallback_exhausted=isinstance(error, FallbackExhaustionError)
         )
         
         # Store failure report
-        self.failure_reports[error_id] = failure_report
+        self._store_failure_report(failure_report)
         
         # Log the failure
         logger.error(
-            f"Analysis failure [{error_id}]: {error_code} - {message}",
+            "Analysis failure [%s]: %s - %s", error_id, error_code, message,
             extra={
                 "error_id": error_id,
                 "file_path": file_path,
@@ -228,81 +325,145 @@ class AnalysisFailureHandler:
             }
         )
         
+        # Only escalated or high-priority failures carry a stack trace
+        needs_intervention = self._should_create_intervention_task(error_code, failure_report)
+        if needs_intervention or self._error_patterns.get(
+            error_code, _DEFAULT_PATTERN
+        ).priority in (InterventionPriority.HIGH, InterventionPriority.CRITICAL):
+            failure_report.stack_trace = _format_active_exception()
+            failure_report.invalidate_cache()
+        
         # Create manual intervention task if needed
-        if self._should_create_intervention_task(error_code, failure_report):
-            intervention_task = await self.create_manual_intervention_task(failure_report)
-            logger.warning(f"Created manual intervention task: {intervention_task.task_id}")
+        if needs_intervention:
+            intervention_task = self.create_manual_intervention_task(failure_report)
+            if intervention_task is not None:
+                logger.warning("Created manual intervention task: %s", intervention_task.task_id)
         
         return failure_report
     
+    async def handle_failure_async(
+        self, 
+        error: Exception, 
+        file_path: Optional[str] = None,
+        attempted_tools: Optional[List[str]] = None,
+        context: Optional[Dict[str, Any]] = None
+    ) -> FailureReport:
+        """Awaitable variant of handle_failure, kept for API compatibility."""
+        return self.handle_failure(error, file_path, attempted_tools, context)
+    
+    def _store_failure_report(self, failure_report: FailureReport) -> None:
+        """Store a failure report, evicting the oldest one when at capacity."""
+        if len(self.failure_reports) >= MAX_FAILURE_REPORTS:
+            _, evicted = self.failure_reports.popitem(last=False)
+            timestamps = self._recent_by_code.get(evicted.error_code)
+            if timestamps and timestamps[0] <= evicted.ts_epoch:
+                timestamps.popleft()
+        
+        self.failure_reports[failure_report.error_id] = failure_report
+        self._recent_by_code[failure_report.error_code].append(failure_report.ts_epoch)
+        
+        # Reports are kept in arrival order, so the first one is the oldest;
+        # while it is within retention a cleanup would free nothing
+        if (
+            len(self.failure_reports) >= MAX_FAILURE_REPORTS * CLEANUP_HIGH_WATER_RATIO
+            and (self._cleanup_task is None or self._cleanup_task.done())
+            and next(iter(self.failure_reports.values())).ts_epoch
+            < time.time() - RECORD_RETENTION_DAYS * 86400
+        ):
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                # No event loop to run cleanup on; the hard cap still applies
+                return
+            self._cleanup_task = loop.create_task(self.cleanup_old_records())
+    
     def _should_create_intervention_task(self, error_code: str, failure_report: FailureReport) -> bool:
         """Determine if a manual intervention task should be created."""
-        pattern = self._error_patterns.get(error_code, {})
+        pattern = self._error_patterns.get(error_code, _DEFAULT_PATTERN)
         
         # Always create task for critical errors
-        if pattern.get("priority") == InterventionPriority.CRITICAL:
+        if pattern.priority == InterventionPriority.CRITICAL:
             return True
         
         # Check if this error type has occurred recently
-        recent_failures = self._get_recent_failures_by_type(error_code, hours=24)
-        escalation_threshold = pattern.get("escalation_threshold", 1)
+        return self._count_recent_failures(error_code) >= pattern.escalation_threshold
+    
+    def _count_recent_failures(self, error_code: str) -> int:
+        """Count failures of a specific type within the escalation window."""
+        timestamps = self._recent_by_code.get(error_code)
+        if not timestamps:
+            return 0
         
-        return len(recent_failures) >= escalation_threshold
+        cutoff_time = time.time() - ESCALATION_WINDOW_SECONDS
+        while timestamps and timestamps[0] < cutoff_time:
+            timestamps.popleft()
+        return len(timestamps)
     
     def _get_recent_failures_by_type(self, error_code: str, hours: int = 24) -> List[FailureReport]:
         """Get recent failures of a specific type."""
-        cutoff_time = datetime.utcnow() - timedelta(hours=hours)
+        cutoff_time = time.time() - hours * 3600
         return [
             report for report in self.failure_reports.values()
-            if report.error_code == error_code and report.timestamp >= cutoff_time
+            if report.error_code == error_code and report.ts_epoch >= cutoff_time
         ]
     
-    async def create_manual_intervention_task(self, failure_report: FailureReport) -> InterventionTask:
-        """Create a manual intervention task for a failure."""
-        import uuid
+    def create_manual_intervention_task(self, failure_report: FailureReport) -> Optional[InterventionTask]:
+        """Create a manual intervention task for a failure.
+        
+        Returns None when the task limit is reached and every task is still
+        open; open work is never evicted to make room.
+        """
+        if len(self.intervention_tasks) >= MAX_INTERVENTION_TASKS and not self._evict_intervention_task():
+            logger.error(
+                "Intervention task limit reached with no closed tasks to evict; "
+                "no task created for error [%s]",
+                failure_report.error_id,
+                extra={"error_id": failure_report.error_id, "error_code": failure_report.error_code}
+            )
+            return None
         
-        task_id = str(uuid.uuid4())
-        pattern = self._error_patterns.get(failure_report.error_code, {})
+        task_id = _next_id("task")
+        pattern = self._error_patterns.get(failure_report.error_code, _DEFAULT_PATTERN)
         
         intervention_task = InterventionTask(
             task_id=task_id,
             failure_report=failure_report,
-            priority=pattern.get("priority", InterventionPriority.MEDIUM),
+            priority=pattern.priority,
             status=InterventionStatus.PENDING,
-            created_at=datetime.utcnow(),
+            created_epoch=time.time(),
             assigned_to=None,
             notes=[],
-            resolution_steps=pattern.get("resolution_steps", []),
-            estimated_effort=self._estimate_effort(failure_report.error_code)
+            resolution_steps=list(pattern.resolution_steps),
+            estimated_effort=pattern.effort
         )
         
         self.intervention_tasks[task_id] = intervention_task
         
         # Log intervention task creation
         logger.info(
-            f"Created intervention task [{task_id}] for error [{failure_report.error_id}]",
+            "Created intervention task [%s] for error [%s]",
+            task_id, failure_report.error_id,
             extra={
                 "task_id": task_id,
                 "error_id": failure_report.error_id,
-                "priority": intervention_task.priority.value,
+                "priority": intervention_task.priority,
                 "error_code": failure_report.error_code
             }
         )
         
         return intervention_task
     
+    def _evict_intervention_task(self) -> bool:
+        """Evict the longest-closed task; returns False if every task is still open."""
+        if not self._closed_task_ids:
+            return False
+        task_id, _ = self._closed_task_ids.popitem(last=False)
+        del self.intervention_tasks[task_id]
+        return True
+    
     def _estimate_effort(self, error_code: str) -> str:
         """Estimate effort required to resolve an error type."""
-        effort_map = {
-            "TOOL_INIT_ERROR": "30-60 minutes",
-            "FILE_ACCESS_ERROR": "15-30 minutes",
-            "UNSUPPORTED_FILE_TYPE": "5-15 minutes",
-            "LLM_API_ERROR": "15-45 minutes",
-            "PROCESSING_TIMEOUT": "20-40 minutes",
-            "FALLBACK_EXHAUSTION": "60-120 minutes",
-            "CONFIGURATION_ERROR": "10-30 minutes"
-        }
-        return effort_map.get(error_code, "30-60 minutes")
+        return self._error_patterns.get(error_code, _DEFAULT_PATTERN).effort
     
     def get_pending_interventions(self) -> List[InterventionTask]:
         """Get all pending manual intervention tasks."""
@@ -328,20 +489,25 @@ class AnalysisFailureHandler:
             return False
         
         task.status = status
+        if status in _CLOSED_STATUSES:
+            self._closed_task_ids[task_id] = None
+        else:
+            self._closed_task_ids.pop(task_id, None)
         if notes:
-            task.notes.append(f"[{datetime.utcnow().isoformat()}] {notes}")
+            task.notes.append(f"[{datetime.now(timezone.utc).isoformat()}] {notes}")
         if assigned_to:
             task.assigned_to = assigned_to
+        task.invalidate_cache()
         
-        logger.info(f"Updated intervention task [{task_id}] status to {status.value}")
+        logger.info("Updated intervention task [%s] status to %s", task_id, status.value)
         return True
     
     def get_failure_statistics(self, hours: int = 24) -> Dict[str, Any]:
         """Get failure statistics for the specified time period."""
-        cutoff_time = datetime.utcnow() - timedelta(hours=hours)
+        cutoff_time = time.time() - hours * 3600
         recent_failures = [
             report for report in self.failure_reports.values()
-            if report.timestamp >= cutoff_time
+            if report.ts_epoch >= cutoff_time
         ]
         
         # Count by error code
@@ -364,14 +530,14 @@ class AnalysisFailureHandler:
             "time_period_hours": hours
         }
     
-    async def cleanup_old_records(self, days: int = 30) -> Tuple[int, int]:
+    async def cleanup_old_records(self, days: int = RECORD_RETENTION_DAYS) -> Tuple[int, int]:
         """Clean up old failure reports and resolved intervention tasks."""
-        cutoff_time = datetime.utcnow() - timedelta(days=days)
+        cutoff_time = time.time() - days * 86400
         
         # Clean up old failure reports
         old_failures = [
             error_id for error_id, report in self.failure_reports.items()
-            if report.timestamp < cutoff_time
+            if report.ts_epoch < cutoff_time
         ]
         for error_id in old_failures:
             del self.failure_reports[error_id]
@@ -379,26 +545,21 @@ class AnalysisFailureHandler:
         # Clean up resolved intervention tasks
         old_tasks = [
             task_id for task_id, task in self.intervention_tasks.items()
-            if task.status in [InterventionStatus.RESOLVED, InterventionStatus.DISMISSED]
-            and task.created_at < cutoff_time
+            if task.status in _CLOSED_STATUSES
+            and task.created_epoch < cutoff_time
         ]
         for task_id in old_tasks:
             del self.intervention_tasks[task_id]
+            self._closed_task_ids.pop(task_id, None)
         
-        logger.info(f"Cleaned up {len(old_failures)} old failure reports and {len(old_tasks)} old intervention tasks")
+        logger.info("Cleaned up %s old failure reports and %s old intervention tasks", len(old_failures), len(old_tasks))
         return len(old_failures), len(old_tasks)
 
-# Global error handler instance
-_error_handler: Optional[AnalysisFailureHandler] = None
-
+@cache
 def get_error_handler() -> AnalysisFailureHandler:
     """Get or create the global error handler instance."""
-    global _error_handler
-    if _error_handler is None:
-        _error_handler = AnalysisFailureHandler()
-    return _error_handler
+    return AnalysisFailureHandler()
 
 def reset_error_handler() -> None:
     """Reset the global error handler instance (useful for testing)."""
-    global _error_handler
-    _error_handler = None
+    get_error_handler.cache_clear()
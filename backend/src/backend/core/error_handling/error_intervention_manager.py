@@ -1,14 +1,17 @@
 """Error Intervention Manager for handling analysis failures requiring manual intervention."""
 import os
-import json
 import logging
+import re
 import traceback
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Any, Optional
 from pathlib import Path
-import uuid
+from secrets import token_hex
 from datetime import datetime, timedelta
 from enum import Enum
 import asyncio
+import bisect
 
 from pydantic import BaseModel
 from ...schema.document_analysis import AnalyzeDocumentErrorResponse
@@ -16,6 +19,47 @@ from ..config import get_settings
 
 logger = logging.getLogger(__name__)
 
+# Task writes are coalesced by the background writer: it waits this long after
+# the first queued write and then flushes up to WRITE_BATCH_SIZE queued tasks,
+# writing each distinct task once
+WRITE_BATCH_INTERVAL_SECONDS = 0.1
+WRITE_BATCH_SIZE = 32
+
+# Notification log templates, filled with str.format_map
+_INTERVENTION_TEMPLATE = """INTERVENTION REQUIRED:
+MANUAL INTERVENTION REQUIRED
+
+Task ID: {task_id}
+Request ID: {request_id}
+Priority: {priority}
+Error Type: {error_type}
+Document: {document_path}
+Error: {error_message}
+
+Created: {created_at}
+
+Please review and resolve this issue in the intervention management system.
+"""
+
+_ESCALATION_TEMPLATE = """ESCALATION:
+INTERVENTION TASK ESCALATED
+
+Task ID: {task_id}
+New Priority: {priority}
+Escalation Count: {escalation_count}
+Reason: {reason}
+
+Original Error: {error_message}
+Document: {document_path}
+
+This task requires immediate attention.
+"""
+
+def _format_traceback(error: Exception) -> str:
+    """Format an exception's traceback from the exception itself, so it also
+    works outside the except block that caught it."""
+    return "".join(traceback.format_exception(type(error), error, error.__traceback__))
+
 class ErrorType(str, Enum):
     """Classification of error types for manual intervention."""
     TOOL_FAILURE = "tool_failure"
@@ -33,6 +77,15 @@ class InterventionPriority(str, Enum):
     MEDIUM = "medium"
     LOW = "low"
 
+# Rank of each priority, most urgent first; used for ordering and escalation
+_PRIORITY_ORDER: Dict[InterventionPriority, int] = {
+    InterventionPriority.CRITICAL: 0,
+    InterventionPriority.HIGH: 1,
+    InterventionPriority.MEDIUM: 2,
+    InterventionPriority.LOW: 3
+}
+_PRIORITY_BY_RANK = tuple(_PRIORITY_ORDER)
+
 class InterventionStatus(str, Enum):
     """Status of manual intervention tasks."""
     PENDING_REVIEW = "pending_review"
@@ -81,6 +134,19 @@ class ErrorInterventionManager:
         
         # Active intervention tasks
         self.active_tasks: Dict[str, InterventionTask] = {}
+        # Active tasks indexed by the original request ID, each request's tasks
+        # in the order they became active
+        self._by_request_id: Dict[str, Dict[str, InterventionTask]] = {}
+        # Per-priority (created_at, task_id) keys kept in sorted order, so
+        # listing tasks never needs a sort
+        self._by_priority: Dict[InterventionPriority, List[tuple]] = {
+            priority: [] for priority in InterventionPriority
+        }
+        self._error_type_counts: Counter = Counter()
+        
+        # Background writer state, created lazily on the first store
+        self._write_queue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
         
         # Load existing tasks from disk
         self._load_existing_tasks()
@@ -137,17 +203,55 @@ class ErrorInterventionManager:
                 "invalid config"
             ]
         }
+        
+        # Compile every pattern into one case-insensitive scanner. Each
+        # pattern maps to the rank of the first error type listing it, so the
+        # earliest type still wins when several patterns match. The lookahead
+        # reports matches at every position, including overlapping ones.
+        self._pattern_rank: Dict[str, int] = {}
+        self._ranked_types: List[ErrorType] = list(self.error_patterns)
+        for rank, patterns in enumerate(self.error_patterns.values()):
+            for pattern in patterns:
+                self._pattern_rank.setdefault(pattern.lower(), rank)
+        alternatives = sorted(self._pattern_rank, key=self._pattern_rank.__getitem__)
+        self._pattern_scanner = re.compile(
+            "(?=(" + "|".join(map(re.escape, alternatives)) + "))"
+        )
+        
+        # Well-known exception classes (and their subclasses) are classified
+        # by type alone, before (and instead of) any message scan
+        self._exc_class_map: Dict[type, ErrorType] = {
+            MemoryError: ErrorType.RESOURCE_ERROR,
+            TimeoutError: ErrorType.NETWORK_ERROR,
+            ConnectionError: ErrorType.NETWORK_ERROR,
+            PermissionError: ErrorType.VALIDATION_ERROR,
+            FileNotFoundError: ErrorType.VALIDATION_ERROR,
+            KeyError: ErrorType.CONFIGURATION_ERROR
+        }
     
     def classify_error(self, error: Exception) -> ErrorType:
         """Automatically classify error type based on error message and type."""
-        error_message = str(error).lower()
-        error_type_name = type(error).__name__.lower()
+        exc_class_map = self._exc_class_map
+        for cls in type(error).__mro__:
+            known_type = exc_class_map.get(cls)
+            if known_type is not None:
+                return known_type
         
-        # Check each error pattern
-        for error_type, patterns in self.error_patterns.items():
-            for pattern in patterns:
-                if pattern.lower() in error_message or pattern.lower() in error_type_name:
-                    return error_type
+        # Message and type name are scanned together in a single pass; the NUL
+        # separator keeps patterns from matching across the two
+        haystack = f"{error}\0{type(error).__name__}".lower()
+        pattern_rank = self._pattern_rank
+        
+        best = len(self._ranked_types)
+        for match in self._pattern_scanner.finditer(haystack):
+            rank = pattern_rank[match.group(1)]
+            if rank < best:
+                best = rank
+                if rank == 0:
+                    break
+        
+        if best < len(self._ranked_types):
+            return self._ranked_types[best]
         
         # Default to unknown error
         return ErrorType.UNKNOWN_ERROR
@@ -189,16 +293,24 @@ class ErrorInterventionManager:
         Returns:
             InterventionTask created for manual review
         """
+        # One timestamp for the report and the task
+        now = datetime.utcnow()
+        # The original error's traceback, formatted when a report first stores
+        # it and reused by the fallback report if the primary path fails later
+        stack_trace: Optional[str] = None
         try:
-            # Create detailed error report
-            error_report = ErrorReport(
+            # Create detailed error report. Every field is built here from
+            # known types, so validation is skipped; tasks loaded from disk
+            # are still fully validated.
+            stack_trace = _format_traceback(error)
+            error_report = ErrorReport.model_construct(
                 request_id=request_id,
                 error_type=self.classify_error(error),
                 error_message=str(error),
                 document_path=document_path,
-                stack_trace=traceback.format_exc(),
+                stack_trace=stack_trace,
                 context=context,
-                timestamp=datetime.utcnow(),
+                timestamp=now,
                 requires_manual_intervention=True,
                 retry_attempts=context.get("retry_attempts", 0),
                 max_retries=3
@@ -208,14 +320,14 @@ class ErrorInterventionManager:
             priority = self.calculate_priority(error_report)
             
             # Create intervention task
-            task = InterventionTask(
-                id=str(uuid.uuid4()),
+            task = InterventionTask.model_construct(
+                id=token_hex(16),
                 request_id=request_id,
                 error_report=error_report,
                 priority=priority,
                 status=InterventionStatus.PENDING_REVIEW,
-                created_at=datetime.utcnow(),
-                updated_at=datetime.utcnow(),
+                created_at=now,
+                updated_at=now,
                 escalation_count=0
             )
             
@@ -223,103 +335,149 @@ class ErrorInterventionManager:
             await self._store_intervention_task(task)
             
             # Add to active tasks
-            self.active_tasks[task.id] = task
+            self._add_active_task(task)
             
             # Send notifications
             await self._notify_manual_intervention_required(task)
             
             logger.error(
-                f"Manual intervention required for request {request_id}: {error_report.error_type.value} - {error_report.error_message}"
+                "Manual intervention required for request %s: %s - %s",
+                request_id, error_report.error_type.value, error_report.error_message
             )
             
             return task
             
         except Exception as handling_error:
-            logger.error(f"Failed to handle analysis failure: {str(handling_error)}")
+            logger.error("Failed to handle analysis failure: %s", handling_error)
             # Create a minimal intervention task for the handling failure itself
             fallback_task = InterventionTask(
-                id=str(uuid.uuid4()),
+                id=token_hex(16),
                 request_id=request_id,
                 error_report=ErrorReport(
                     request_id=request_id,
                     error_type=ErrorType.UNKNOWN_ERROR,
                     error_message=f"Error handling failure: {str(handling_error)}",
                     document_path=document_path,
-                    stack_trace=traceback.format_exc(),
-                    context=context,
-                    timestamp=datetime.utcnow()
+                    stack_trace=stack_trace if stack_trace is not None else _format_traceback(error),
+                    context={
+                        "handling_error": str(handling_error),
+                        "context_keys": list(context.keys())
+                    },
+                    timestamp=now
                 ),
                 priority=InterventionPriority.CRITICAL,
                 status=InterventionStatus.PENDING_REVIEW,
-                created_at=datetime.utcnow(),
-                updated_at=datetime.utcnow()
+                created_at=now,
+                updated_at=now
             )
             
-            self.active_tasks[fallback_task.id] = fallback_task
+            self._add_active_task(fallback_task)
             return fallback_task
     
     async def _store_intervention_task(self, task: InterventionTask) -> None:
-        """Store intervention task to disk for persistence."""
+        """Queue intervention task for persistence by the background writer."""
         try:
-            task_file = self.intervention_dir / f"{task.id}.json"
-            
-            # Convert to dict for JSON serialization
-            task_dict = task.dict()
-            
-            # Convert datetime objects to ISO format
-            for key, value in task_dict.items():
-                if isinstance(value, datetime):
-                    task_dict[key] = value.isoformat()
-            
-            # Handle nested datetime in error_report
-            if "error_report" in task_dict and "timestamp" in task_dict["error_report"]:
-                task_dict["error_report"]["timestamp"] = task_dict["error_report"]["timestamp"]
-            
-            # Write to file
-            with open(task_file, 'w') as f:
-                json.dump(task_dict, f, indent=2, default=str)
+            # Serialize now, so the writer thread stores this snapshot rather
+            # than a model the event loop may still be changing. Pydantic
+            # serializes datetimes and enums itself; anything unexpected in the
+            # free-form context falls back to str(). Unset optional fields are
+            # left out and default back to None on load.
+            payload = task.model_dump_json(indent=2, exclude_none=True, fallback=str)
+        except Exception as e:
+            logger.error("Failed to store intervention task %s: %s", task.id, e)
+            return
+        
+        loop = asyncio.get_running_loop()
+        if (self._writer_task is None or self._writer_task.done()
+                or self._writer_task.get_loop() is not loop):
+            self._write_queue = asyncio.Queue()
+            self._writer_task = loop.create_task(self._writer_loop(self._write_queue))
+        await self._write_queue.put((task.id, payload))
+    
+    async def _writer_loop(self, queue: asyncio.Queue) -> None:
+        """Drain the write queue in batches, writing each task once per batch."""
+        while True:
+            task_id, payload = await queue.get()
+            pending = {task_id: payload}
+            received = 1
+            
+            # Let rapid follow-up updates of the same tasks coalesce
+            await asyncio.sleep(WRITE_BATCH_INTERVAL_SECONDS)
+            while received < WRITE_BATCH_SIZE:
+                try:
+                    task_id, payload = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                pending[task_id] = payload
+                received += 1
+            
+            try:
+                # File I/O runs off the event loop
+                await asyncio.to_thread(self._write_task_files, pending)
+            finally:
+                for _ in range(received):
+                    queue.task_done()
+    
+    async def close(self) -> None:
+        """Flush queued task writes and stop the background writer."""
+        writer = self._writer_task
+        if writer is None or writer.done():
+            return
+        if writer.get_loop() is asyncio.get_running_loop():
+            await self._write_queue.join()
+        writer.cancel()
+        self._writer_task = None
+    
+    def _write_task_files(self, payloads: Dict[str, str]) -> None:
+        """Write a batch of serialized intervention tasks to disk (runs in a worker thread)."""
+        for task_id, payload in payloads.items():
+            self._write_task_file(task_id, payload)
+    
+    def _write_task_file(self, task_id: str, payload: str) -> None:
+        """Write a serialized intervention task to disk."""
+        try:
+            task_file = self.intervention_dir / f"{task_id}.json"
+            task_file.write_text(payload)
                 
-            logger.debug(f"Stored intervention task {task.id} to disk")
+            logger.debug("Stored intervention task %s to disk", task_id)
             
         except Exception as e:
-            logger.error(f"Failed to store intervention task {task.id}: {str(e)}")
+            logger.error("Failed to store intervention task %s: %s", task_id, e)
     
     def _load_existing_tasks(self) -> None:
         """Load existing intervention tasks from disk."""
         try:
             if not self.intervention_dir.exists():
                 return
-                
-            for task_file in self.intervention_dir.glob("*.json"):
-                try:
-                    with open(task_file, 'r') as f:
-                        task_dict = json.load(f)
-                    
-                    # Convert ISO datetime strings back to datetime objects
-                    for key in ['created_at', 'updated_at', 'resolution_time']:
-                        if task_dict.get(key):
-                            task_dict[key] = datetime.fromisoformat(task_dict[key])
-                    
-                    if task_dict.get('error_report', {}).get('timestamp'):
-                        task_dict['error_report']['timestamp'] = datetime.fromisoformat(
-                            task_dict['error_report']['timestamp']
-                        )
-                    
-                    # Create task object
-                    task = InterventionTask(**task_dict)
-                    
-                    # Only load active tasks (not resolved/cancelled)
-                    if task.status in [InterventionStatus.PENDING_REVIEW, InterventionStatus.IN_PROGRESS]:
-                        self.active_tasks[task.id] = task
-                        
-                except Exception as e:
-                    logger.error(f"Failed to load intervention task from {task_file}: {str(e)}")
-                    continue
+            
+            # Reads are I/O-bound, so files are loaded on a thread pool
+            with os.scandir(self.intervention_dir) as entries:
+                task_files = [
+                    entry.path for entry in entries
+                    if entry.name.endswith(".json") and entry.is_file(follow_symlinks=False)
+                ]
+            if task_files:
+                max_workers = min(32, (os.cpu_count() or 1) * 4, len(task_files))
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    for task in executor.map(self._load_task_file, task_files):
+                        # Only load active tasks (not resolved/cancelled)
+                        if task is not None and task.status in [InterventionStatus.PENDING_REVIEW, InterventionStatus.IN_PROGRESS]:
+                            self._add_active_task(task)
                     
-            logger.info(f"Loaded {len(self.active_tasks)} active intervention tasks")
+            logger.info("Loaded %d active intervention tasks", len(self.active_tasks))
             
         except Exception as e:
-            logger.error(f"Failed to load existing intervention tasks: {str(e)}")
+            logger.error("Failed to load existing intervention tasks: %s", e)
+    
+    def _load_task_file(self, task_file: str) -> Optional[InterventionTask]:
+        """Load a single intervention task file, or None if it is unreadable."""
+        try:
+            # Parse and validate straight from the raw bytes
+            with open(task_file, "rb") as f:
+                return InterventionTask.model_validate_json(f.read())
+        except Exception as e:
+            logger.error("Failed to load intervention task from %s: %s", task_file, e)
+            return None
     
     async def _notify_manual_intervention_required(self, task: InterventionTask) -> None:
         """Send notifications about manual intervention requirements."""
@@ -327,22 +485,17 @@ class ErrorInterventionManager:
             # For now, just log the notification
             # In production, you would integrate with email, Slack, or other notification systems
             
-            notification_message = f"""
-MANUAL INTERVENTION REQUIRED
-
-Task ID: {task.id}
-Request ID: {task.request_id}
-Priority: {task.priority.value.upper()}
-Error Type: {task.error_report.error_type.value}
-Document: {task.error_report.document_path}
-Error: {task.error_report.error_message}
-
-Created: {task.created_at.isoformat()}
-
-Please review and resolve this issue in the intervention management system.
-            """
-            
-            logger.warning(f"INTERVENTION REQUIRED: {notification_message}")
+            if logger.isEnabledFor(logging.WARNING):
+                error_report = task.error_report
+                logger.warning(_INTERVENTION_TEMPLATE.format_map({
+                    "task_id": task.id,
+                    "request_id": task.request_id,
+                    "priority": task.priority.value.upper(),
+                    "error_type": error_report.error_type.value,
+                    "document_path": error_report.document_path,
+                    "error_message": error_report.error_message,
+                    "created_at": task.created_at.isoformat()
+                }))
             
             # TODO: Implement actual notification sending
             # - Email notifications to administrators
@@ -351,36 +504,65 @@ Please review and resolve this issue in the intervention management system.
             # - SMS for critical issues
             
         except Exception as e:
-            logger.error(f"Failed to send intervention notification: {str(e)}")
+            logger.error("Failed to send intervention notification: %s", e)
+    
+    def _add_active_task(self, task: InterventionTask) -> None:
+        """Register an active task and keep the lookup indexes in sync."""
+        self.active_tasks[task.id] = task
+        self._by_request_id.setdefault(task.request_id, {})[task.id] = task
+        bisect.insort(self._by_priority[task.priority], (task.created_at, task.id))
+        self._error_type_counts[task.error_report.error_type] += 1
+    
+    def _remove_active_task(self, task: InterventionTask) -> None:
+        """Drop an active task and its index entries."""
+        del self.active_tasks[task.id]
+        request_tasks = self._by_request_id[task.request_id]
+        del request_tasks[task.id]
+        if not request_tasks:
+            del self._by_request_id[task.request_id]
+        self._discard_priority_key(task)
+        self._error_type_counts[task.error_report.error_type] -= 1
+    
+    def _discard_priority_key(self, task: InterventionTask) -> None:
+        """Remove a task's key from its priority bucket."""
+        bucket = self._by_priority[task.priority]
+        key = (task.created_at, task.id)
+        index = bisect.bisect_left(bucket, key)
+        if index < len(bucket) and bucket[index] == key:
+            del bucket[index]
+    
+    def _set_task_priority(self, task: InterventionTask, priority: InterventionPriority) -> None:
+        """Change a task's priority, moving it to the matching bucket if active."""
+        if task.id in self.active_tasks:
+            self._discard_priority_key(task)
+            bisect.insort(self._by_priority[priority], (task.created_at, task.id))
+        task.priority = priority
     
     def get_active_tasks(self, priority: Optional[InterventionPriority] = None) -> List[InterventionTask]:
         """Get list of active intervention tasks, optionally filtered by priority."""
-        tasks = list(self.active_tasks.values())
+        active_tasks = self.active_tasks
         
         if priority:
-            tasks = [task for task in tasks if task.priority == priority]
-        
-        # Sort by priority and creation time
-        priority_order = {
-            InterventionPriority.CRITICAL: 0,
-            InterventionPriority.HIGH: 1,
-            InterventionPriority.MEDIUM: 2,
-            InterventionPriority.LOW: 3
-        }
+            return [active_tasks[task_id] for _, task_id in self._by_priority[priority]]
         
-        tasks.sort(key=lambda t: (priority_order[t.priority], t.created_at))
-        return tasks
+        # Buckets are already sorted by creation time; walking them from
+        # CRITICAL down to LOW gives the priority order
+        return [
+            active_tasks[task_id]
+            for bucket_priority in _PRIORITY_BY_RANK
+            for _, task_id in self._by_priority[bucket_priority]
+        ]
     
     def get_task_by_id(self, task_id: str) -> Optional[InterventionTask]:
         """Get intervention task by ID."""
         return self.active_tasks.get(task_id)
     
     def get_task_by_request_id(self, request_id: str) -> Optional[InterventionTask]:
-        """Get intervention task by original request ID."""
-        for task in self.active_tasks.values():
-            if task.request_id == request_id:
-                return task
-        return None
+        """Get intervention task by original request ID (the oldest active one)."""
+        request_tasks = self._by_request_id.get(request_id)
+        if not request_tasks:
+            return None
+        return next(iter(request_tasks.values()))
     
     async def update_task_status(
         self,
@@ -393,12 +575,17 @@ Please review and resolve this issue in the intervention management system.
         try:
             task = self.active_tasks.get(task_id)
             if not task:
-                logger.error(f"Intervention task {task_id} not found")
+                logger.error("Intervention task %s not found", task_id)
                 return False
             
+            # Nothing changes, so there is nothing to persist
+            if task.status == status and assigned_to is None and resolution_notes is None:
+                return True
+            
             # Update task
+            now = datetime.utcnow()
             task.status = status
-            task.updated_at = datetime.utcnow()
+            task.updated_at = now
             
             if assigned_to:
                 task.assigned_to = assigned_to
@@ -407,18 +594,18 @@ Please review and resolve this issue in the intervention management system.
                 task.resolution_notes = resolution_notes
             
             if status in [InterventionStatus.RESOLVED, InterventionStatus.CANCELLED]:
-                task.resolution_time = datetime.utcnow()
+                task.resolution_time = now
                 # Remove from active tasks
-                del self.active_tasks[task_id]
+                self._remove_active_task(task)
             
             # Store updated task
             await self._store_intervention_task(task)
             
-            logger.info(f"Updated intervention task {task_id} status to {status.value}")
+            logger.info("Updated intervention task %s status to %s", task_id, status.value)
             return True
             
         except Exception as e:
-            logger.error(f"Failed to update intervention task {task_id}: {str(e)}")
+            logger.error("Failed to update intervention task %s: %s", task_id, e)
             return False
     
     async def escalate_task(self, task_id: str, escalation_reason: str) -> bool:
@@ -430,19 +617,17 @@ Please review and resolve this issue in the intervention management system.
             
             # Increase escalation count
             task.escalation_count += 1
-            task.updated_at = datetime.utcnow()
+            now = datetime.utcnow()
+            task.updated_at = now
             task.status = InterventionStatus.ESCALATED
             
             # Increase priority if possible
-            if task.priority == InterventionPriority.LOW:
-                task.priority = InterventionPriority.MEDIUM
-            elif task.priority == InterventionPriority.MEDIUM:
-                task.priority = InterventionPriority.HIGH
-            elif task.priority == InterventionPriority.HIGH:
-                task.priority = InterventionPriority.CRITICAL
+            rank = _PRIORITY_ORDER[task.priority]
+            if rank > 0:
+                self._set_task_priority(task, _PRIORITY_BY_RANK[rank - 1])
             
             # Add escalation to resolution notes
-            escalation_note = f"\n[ESCALATION {task.escalation_count}] {datetime.utcnow().isoformat()}: {escalation_reason}"
+            escalation_note = f"\n[ESCALATION {task.escalation_count}] {now.isoformat()}: {escalation_reason}"
             task.resolution_notes = (task.resolution_notes or "") + escalation_note
             
             # Store updated task
@@ -451,77 +636,61 @@ Please review and resolve this issue in the intervention management system.
             # Send escalation notification
             await self._notify_escalation(task, escalation_reason)
             
-            logger.warning(f"Escalated intervention task {task_id} to {task.priority.value}")
+            logger.warning("Escalated intervention task %s to %s", task_id, task.priority.value)
             return True
             
         except Exception as e:
-            logger.error(f"Failed to escalate intervention task {task_id}: {str(e)}")
+            logger.error("Failed to escalate intervention task %s: %s", task_id, e)
             return False
     
     async def _notify_escalation(self, task: InterventionTask, reason: str) -> None:
         """Send escalation notifications."""
-        escalation_message = f"""
-INTERVENTION TASK ESCALATED
-
-Task ID: {task.id}
-New Priority: {task.priority.value.upper()}
-Escalation Count: {task.escalation_count}
-Reason: {reason}
-
-Original Error: {task.error_report.error_message}
-Document: {task.error_report.document_path}
-
-This task requires immediate attention.
-        """
-        
-        logger.critical(f"ESCALATION: {escalation_message}")
+        if logger.isEnabledFor(logging.CRITICAL):
+            logger.critical(_ESCALATION_TEMPLATE.format_map({
+                "task_id": task.id,
+                "priority": task.priority.value.upper(),
+                "escalation_count": task.escalation_count,
+                "reason": reason,
+                "error_message": task.error_report.error_message,
+                "document_path": task.error_report.document_path
+            }))
     
     def get_intervention_statistics(self) -> Dict[str, Any]:
         """Get statistics about intervention tasks."""
         try:
             active_count = len(self.active_tasks)
             
-            # Count by priority
-            priority_counts = {}
-            for priority in InterventionPriority:
-                priority_counts[priority.value] = len([
-                    task for task in self.active_tasks.values() 
-                    if task.priority == priority
-                ])
-            
-            # Count by error type
-            error_type_counts = {}
-            for error_type in ErrorType:
-                error_type_counts[error_type.value] = len([
-                    task for task in self.active_tasks.values()
-                    if task.error_report.error_type == error_type
-                ])
-            
-            # Average age of active tasks
-            if active_count > 0:
-                total_age = sum([
-                    (datetime.utcnow() - task.created_at).total_seconds()
-                    for task in self.active_tasks.values()
-                ])
-                avg_age_hours = (total_age / active_count) / 3600
-            else:
-                avg_age_hours = 0
+            # Counts by priority and error type are maintained on insert/remove
+            priority_counts = {
+                priority.value: len(bucket)
+                for priority, bucket in self._by_priority.items()
+            }
+            error_type_counts = {
+                error_type.value: self._error_type_counts[error_type]
+                for error_type in ErrorType
+            }
+            
+            # Average and maximum age of active tasks in one pass
+            now = datetime.utcnow()
+            total_age = 0.0
+            max_age = 0.0
+            for task in self.active_tasks.values():
+                age = (now - task.created_at).total_seconds()
+                total_age += age
+                if age > max_age:
+                    max_age = age
+            avg_age_hours = (total_age / active_count) / 3600 if active_count > 0 else 0
             
             return {
                 "active_tasks": active_count,
                 "priority_distribution": priority_counts,
                 "error_type_distribution": error_type_counts,
                 "average_age_hours": round(avg_age_hours, 2),
-                "oldest_task_age_hours": round(
-                    max([
-                        (datetime.utcnow() - task.created_at).total_seconds() / 3600
-                        for task in self.active_tasks.values()
-                    ], default=0), 2
-                )
+                "oldest_task_age_hours": round(max_age / 3600, 2)
             }
             
         except Exception as e:
-            logger.error(f"Failed to get intervention statistics: {str(e)}")
+            logger.error("Failed to get intervention statistics: %s", e)
             return {"error": str(e)}
 
 # Global manager instance
@@ -1,12 +1,17 @@
 """Comprehensive error handling service that integrates all fallback mechanisms."""
 import asyncio
 import logging
+import time
+from collections import OrderedDict
 from typing import Dict, List, Any, Optional, Union
 from datetime import datetime
 import uuid
-import traceback
 
-from ..error_handling.circuit_breaker import get_circuit_breaker_manager, CircuitBreakerError
+from ..error_handling.circuit_breaker import (
+    get_circuit_breaker_manager,
+    CircuitBreakerError,
+    run_with_timeout
+)
 from ..error_handling.error_handler import get_error_handler
 from ..error_handling.error_intervention_manager import get_error_intervention_manager
 from ...exceptions.analysis_exceptions import ProcessingTimeoutError, DocumentAnalysisError
@@ -14,20 +19,66 @@ from ...schema.document_analysis import AnalyzeDocumentResponse, TagModel, Analy
 
 logger = logging.getLogger(__name__)
 
+# Maximum entries kept in the manual tagging queue; oldest are evicted first
+MANUAL_QUEUE_MAX_SIZE = 1000
+
+# Manual queue priority by error type; anything else is "medium"
+_QUEUE_PRIORITY_MAP: Dict[str, str] = {
+    "timeout": "medium",
+    "circuit_breaker_open": "low",
+    "ProcessingTimeoutError": "medium",
+    "LLMAPIError": "high",
+    "ToolInitializationError": "high",
+    "ConfigurationError": "critical",
+    "FallbackExhaustionError": "critical"
+}
+
+# Generic tags returned on timeout when no partial results were saved; built
+# once since they never change
+_FALLBACK_TAGS = (
+    TagModel(
+        name="processing-interrupted",
+        confidence=0.5,
+        category="system",
+        description="Document processing was interrupted and requires manual review"
+    ),
+    TagModel(
+        name="partial-analysis",
+        confidence=0.4,
+        category="system",
+        description="Incomplete analysis due to processing timeout"
+    )
+)
+
+# Constant part of the details returned while the circuit breaker is open
+_CB_OPEN_DETAILS: Dict[str, Any] = {
+    "circuit_breaker_state": "open",
+    "retry_after_minutes": 5
+}
+
 class GracefulDegradationService:
     """Service that provides graceful degradation for AI processing failures."""
     
+    __slots__ = (
+        "circuit_manager", "error_handler", "intervention_manager",
+        "manual_queue", "manual_queue_max_size", "_queue_count_by_priority",
+        "partial_results"
+    )
+    
     def __init__(self):
         """Initialize the graceful degradation service."""
         self.circuit_manager = get_circuit_breaker_manager()
         self.error_handler = get_error_handler()
         self.intervention_manager = get_error_intervention_manager()
         
-        # Manual tagging queue for failures
-        self.manual_queue: Dict[str, Dict[str, Any]] = {}
+        # Manual tagging queue for failures, oldest first, with per-priority
+        # counts maintained on add/evict so status reads never scan it
+        self.manual_queue: Dict[str, Dict[str, Any]] = OrderedDict()
+        self.manual_queue_max_size = MANUAL_QUEUE_MAX_SIZE
+        self._queue_count_by_priority: Dict[str, int] = {}
         
-        # Partial results storage
-        self.partial_results: Dict[str, Dict[str, Any]] = {}
+        # Partial results storage, keyed by request id then document path
+        self.partial_results: Dict[str, Dict[str, Dict[str, Any]]] = {}
     
     async def process_with_fallback(
         self,
@@ -35,7 +86,8 @@ class GracefulDegradationService:
         document_path: str,
         max_tags: int = 10,
         generate_summary: bool = False,
-        timeout_seconds: int = 120
+        timeout_seconds: int = 120,
+        enforce_timeout: bool = True
     ) -> Union[AnalyzeDocumentResponse, AnalyzeDocumentErrorResponse]:
         """
         Process document with comprehensive fallback mechanisms.
@@ -46,30 +98,33 @@ class GracefulDegradationService:
             max_tags: Maximum number of tags to generate
             generate_summary: Whether to generate summary
             timeout_seconds: Processing timeout in seconds
+            enforce_timeout: Set to False when processing_func already enforces
+                timeout_seconds itself (e.g. via CircuitBreaker.call), so the
+                deadline is not applied twice
             
         Returns:
             Either successful response or error response with partial results
         """
-        request_id = str(uuid.uuid4())
-        start_time = datetime.utcnow()
+        # The request id is only observable on the error paths, so it is
+        # generated there rather than on every (mostly successful) call
+        start_time = time.monotonic()
         
         try:
-            # Execute with timeout
-            result = await asyncio.wait_for(
-                processing_func(
-                    document_path=document_path,
-                    max_tags=max_tags,
-                    generate_summary=generate_summary
-                ),
-                timeout=timeout_seconds
+            processing = processing_func(
+                document_path=document_path,
+                max_tags=max_tags,
+                generate_summary=generate_summary
             )
             
-            return result
+            # Execute with timeout unless the callee owns it
+            if enforce_timeout:
+                return await run_with_timeout(processing, timeout_seconds)
+            return await processing
             
         except asyncio.TimeoutError:
             # Handle timeout - return partial results if available
             return await self._handle_timeout(
-                request_id=request_id,
+                request_id=str(uuid.uuid4()),
                 document_path=document_path,
                 max_tags=max_tags,
                 timeout_seconds=timeout_seconds,
@@ -79,7 +134,7 @@ class GracefulDegradationService:
         except CircuitBreakerError:
             # Circuit breaker is open - add to manual queue
             return await self._handle_circuit_breaker_open(
-                request_id=request_id,
+                request_id=str(uuid.uuid4()),
                 document_path=document_path,
                 max_tags=max_tags,
                 start_time=start_time
@@ -88,7 +143,7 @@ class GracefulDegradationService:
         except Exception as e:
             # General error handling with manual intervention
             return await self._handle_general_error(
-                request_id=request_id,
+                request_id=str(uuid.uuid4()),
                 document_path=document_path,
                 error=e,
                 max_tags=max_tags,
@@ -101,10 +156,10 @@ class GracefulDegradationService:
         document_path: str,
         max_tags: int,
         timeout_seconds: int,
-        start_time: datetime
+        start_time: float
     ) -> AnalyzeDocumentErrorResponse:
         """Handle processing timeout with partial results."""
-        processing_time = (datetime.utcnow() - start_time).total_seconds()
+        processing_time = time.monotonic() - start_time
         
         # Check for partial results
         partial_tags = self._get_partial_results(request_id, document_path)
@@ -142,7 +197,7 @@ class GracefulDegradationService:
         )
         
         # Handle failure through error system
-        await self.error_handler.handle_failure(
+        self.error_handler.handle_failure(
             error=timeout_error,
             file_path=document_path,
             context={
@@ -152,7 +207,7 @@ class GracefulDegradationService:
             }
         )
         
-        return AnalyzeDocumentErrorResponse(
+        return AnalyzeDocumentErrorResponse.model_construct(
             request_id=request_id,
             error="processing_timeout",
             message=f"Document processing timed out after {timeout_seconds} seconds",
@@ -169,10 +224,10 @@ class GracefulDegradationService:
         request_id: str,
         document_path: str,
         max_tags: int,
-        start_time: datetime
+        start_time: float
     ) -> AnalyzeDocumentErrorResponse:
         """Handle circuit breaker open state."""
-        processing_time = (datetime.utcnow() - start_time).total_seconds()
+        processing_time = time.monotonic() - start_time
         
         logger.warning(
             f"Circuit breaker open for document analysis: {document_path}",
@@ -194,15 +249,11 @@ class GracefulDegradationService:
             }
         )
         
-        return AnalyzeDocumentErrorResponse(
+        return AnalyzeDocumentErrorResponse.model_construct(
             request_id=request_id,
             error="service_unavailable",
             message="AI analysis service is temporarily unavailable due to repeated failures",
-            details={
-                "circuit_breaker_state": "open",
-                "manual_queue_id": request_id,
-                "retry_after_minutes": 5
-            },
+            details={**_CB_OPEN_DETAILS, "manual_queue_id": request_id},
             created_at=datetime.utcnow()
         )
     
@@ -212,25 +263,30 @@ class GracefulDegradationService:
         document_path: str,
         error: Exception,
         max_tags: int,
-        start_time: datetime
+        start_time: float
     ) -> AnalyzeDocumentErrorResponse:
         """Handle general processing errors."""
-        processing_time = (datetime.utcnow() - start_time).total_seconds()
+        processing_time = time.monotonic() - start_time
+        error_message = str(error)
+        error_type = type(error).__name__
         
-        # Log error with full context
+        # Log error with full context; the message and traceback are only
+        # formatted if a handler actually emits the record
         logger.error(
-            f"Document analysis failed for {document_path}: {str(error)}",
+            "Document analysis failed for %s: %s",
+            document_path,
+            error_message,
+            exc_info=error,
             extra={
                 "request_id": request_id,
                 "document_path": document_path,
-                "error_type": type(error).__name__,
-                "processing_time": processing_time,
-                "stack_trace": traceback.format_exc()
+                "error_type": error_type,
+                "processing_time": processing_time
             }
         )
         
         # Handle through error system
-        failure_report = await self.error_handler.handle_failure(
+        failure_report = self.error_handler.handle_failure(
             error=error,
             file_path=document_path,
             context={
@@ -240,35 +296,36 @@ class GracefulDegradationService:
             }
         )
         
-        # Create intervention task if needed
-        await self.intervention_manager.handle_analysis_failure(
-            request_id=request_id,
-            error=error,
-            document_path=document_path,
-            context={
-                "max_tags": max_tags,
-                "processing_time": processing_time,
-                "failure_report_id": failure_report.error_id
-            }
-        )
-        
-        # Add to manual queue
-        await self._add_to_manual_queue(
-            request_id=request_id,
-            document_path=document_path,
-            error_type=type(error).__name__,
-            error_details={
-                "error_message": str(error),
-                "failure_report_id": failure_report.error_id
-            }
+        # Create intervention task if needed and add to manual queue; both
+        # only depend on the failure report, so they run concurrently
+        await asyncio.gather(
+            self.intervention_manager.handle_analysis_failure(
+                request_id=request_id,
+                error=error,
+                document_path=document_path,
+                context={
+                    "max_tags": max_tags,
+                    "processing_time": processing_time,
+                    "failure_report_id": failure_report.error_id
+                }
+            ),
+            self._add_to_manual_queue(
+                request_id=request_id,
+                document_path=document_path,
+                error_type=error_type,
+                error_details={
+                    "error_message": error_message,
+                    "failure_report_id": failure_report.error_id
+                }
+            )
         )
         
-        return AnalyzeDocumentErrorResponse(
+        return AnalyzeDocumentErrorResponse.model_construct(
             request_id=request_id,
             error="analysis_failed",
             message="Document analysis failed and has been queued for manual review",
             details={
-                "error_type": type(error).__name__,
+                "error_type": error_type,
                 "manual_queue_id": request_id,
                 "failure_report_id": failure_report.error_id
             },
@@ -278,25 +335,14 @@ class GracefulDegradationService:
     def _get_partial_results(self, request_id: str, document_path: str) -> List[TagModel]:
         """Get partial results if available."""
         # Check if we have any saved partial results
-        partial_key = f"{request_id}_{document_path}"
-        if partial_key in self.partial_results:
-            return self.partial_results[partial_key].get("tags", [])
+        saved = self.partial_results.get(request_id)
+        if saved is not None:
+            partial = saved.get(document_path)
+            if partial is not None:
+                return partial.get("tags", [])
         
         # Return basic fallback tags
-        return [
-            TagModel(
-                name="processing-interrupted",
-                confidence=0.5,
-                category="system",
-                description="Document processing was interrupted and requires manual review"
-            ),
-            TagModel(
-                name="partial-analysis",
-                confidence=0.4,
-                category="system", 
-                description="Incomplete analysis due to processing timeout"
-            )
-        ]
+        return list(_FALLBACK_TAGS)
     
     async def _add_to_manual_queue(
         self,
@@ -317,7 +363,16 @@ class GracefulDegradationService:
             "retry_count": 0
         }
         
+        counts = self._queue_count_by_priority
+        replaced = self.manual_queue.pop(request_id, None)
+        if replaced is not None:
+            counts[replaced["priority"]] -= 1
+        elif len(self.manual_queue) >= self.manual_queue_max_size:
+            _, evicted = self.manual_queue.popitem(last=False)
+            counts[evicted["priority"]] -= 1
+        
         self.manual_queue[request_id] = queue_entry
+        counts[queue_entry["priority"]] = counts.get(queue_entry["priority"], 0) + 1
         
         logger.info(
             f"Added document to manual queue: {document_path}",
@@ -330,45 +385,33 @@ class GracefulDegradationService:
     
     def _calculate_queue_priority(self, error_type: str) -> str:
         """Calculate priority for manual queue based on error type."""
-        priority_map = {
-            "timeout": "medium",
-            "circuit_breaker_open": "low",
-            "ProcessingTimeoutError": "medium",
-            "LLMAPIError": "high",
-            "ToolInitializationError": "high",
-            "ConfigurationError": "critical",
-            "FallbackExhaustionError": "critical"
-        }
-        return priority_map.get(error_type, "medium")
+        return _QUEUE_PRIORITY_MAP.get(error_type, "medium")
     
     def get_manual_queue_status(self) -> Dict[str, Any]:
         """Get status of manual processing queue."""
-        queue_by_priority = {}
-        for entry in self.manual_queue.values():
-            priority = entry["priority"]
-            if priority not in queue_by_priority:
-                queue_by_priority[priority] = []
-            queue_by_priority[priority].append(entry)
-        
+        oldest = next(iter(self.manual_queue.values()), None)
         return {
             "total_items": len(self.manual_queue),
             "by_priority": {
-                priority: len(items) for priority, items in queue_by_priority.items()
+                priority: count
+                for priority, count in self._queue_count_by_priority.items()
+                if count
             },
-            "oldest_item": min(
-                (entry["created_at"] for entry in self.manual_queue.values()),
-                default=None
-            )
+            "oldest_item": oldest["created_at"] if oldest else None
         }
     
-    def get_health_status(self) -> Dict[str, Any]:
-        """Get comprehensive health status of error handling system."""
-        circuit_breakers = self.circuit_manager.get_all_states()
+    def get_health_status(self, light: bool = False) -> Dict[str, Any]:
+        """Get comprehensive health status of error handling system.
+        
+        With ``light=True`` the per-breaker snapshots are left out and only
+        the aggregate counts are computed.
+        """
+        breaker_counts = self.circuit_manager.count_by_state()
         manual_queue_status = self.get_manual_queue_status()
         
         # Calculate overall health
-        open_breakers = sum(1 for state in circuit_breakers.values() if state["state"] == "open")
-        total_breakers = len(circuit_breakers)
+        open_breakers = breaker_counts["open"]
+        total_breakers = sum(breaker_counts.values())
         
         health_score = 1.0
         if total_breakers > 0:
@@ -388,16 +431,19 @@ class GracefulDegradationService:
         elif health_score < 0.9:
             overall_status = "warning"
         
-        return {
+        status = {
             "overall_status": overall_status,
             "health_score": health_score,
-            "circuit_breakers": circuit_breakers,
+            "circuit_breaker_counts": breaker_counts,
             "manual_queue": manual_queue_status,
             "error_handling": {
                 "intervention_tasks_pending": len(self.error_handler.get_pending_interventions()),
                 "recent_failures_24h": len(self.error_handler._get_recent_failures_by_type("", 24))
             }
         }
+        if not light:
+            status["circuit_breakers"] = self.circuit_manager.get_all_states()
+        return status
 
 # Global service instance
 _graceful_degradation_service: Optional[GracefulDegradationService] = None
@@ -3,18 +3,23 @@ import os
 import logging
 import asyncio
 import time
-import json
-import math
-from typing import List, Dict, Any, Optional, Tuple, Set
+import re
+from typing import List, Dict, Any, Optional, Tuple, Set, Callable
 from pathlib import Path
 from datetime import datetime, timedelta, timezone
+from collections import Counter, OrderedDict
 from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from itertools import repeat
 import sqlite3
+import threading
 from threading import Lock
 
 import tiktoken
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
+from pydantic_core import from_json, to_json
 import google.generativeai as genai
 
 from ...schema.chat import ChatMessage, MessageRole
@@ -29,6 +34,157 @@ from ..config import get_settings
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Exact BPE counts are memoized per manager; a conversation's texts longer than
+# the estimate threshold are counted with a chars-per-token ratio averaged over
+# exact counts of its first TOKEN_CALIBRATION_SAMPLES long texts
+TOKEN_COUNT_CACHE_SIZE = 4096
+TOKEN_ESTIMATE_MIN_CHARS = 2048
+TOKEN_CALIBRATION_SAMPLES = 3
+
+# Embedding requests are coalesced: the background worker waits this long after
+# the first queued request and then embeds up to EMBEDDING_BATCH_SIZE texts in
+# a single Gemini call
+EMBEDDING_BATCH_WAIT_SECONDS = 0.05
+EMBEDDING_BATCH_SIZE = 16
+EMBEDDING_MODEL = "models/text-embedding-004"
+
+# Writes are group-committed the same way: the background writer waits this
+# long after the first queued write group and then commits up to
+# WRITE_BATCH_SIZE groups in one transaction
+WRITE_BATCH_WAIT_SECONDS = 0.005
+WRITE_BATCH_SIZE = 64
+
+# Conversation states, loaded rows and topic matrices kept in memory, least
+# recently used conversations are evicted first
+CONVERSATION_CACHE_SIZE = 1024
+
+# Common words left out of extracted keywords
+_STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by',
+    'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him', 'her', 'us', 'them',
+    'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 'do', 'does', 'did',
+    'will', 'would', 'could', 'should', 'may', 'might', 'can', 'cannot', 'this', 'that', 'these', 'those'
+})
+
+# Keyword candidates are words of three or more letters; stop words of that
+# length match the first alternative and leave the capture group empty
+_KEYWORD_PATTERN = re.compile(
+    r'\b(?:' + '|'.join(sorted(word for word in _STOP_WORDS if len(word) >= 3)) + r')\b'
+    r'|\b([a-zA-Z]{3,})\b'
+)
+
+# Conversations with more topics than this are scored on the executor
+LARGE_TOPIC_COUNT = 2048
+
+# Prepared statements kept per connection; enough for every statement this
+# module issues, so the long-lived connections never re-prepare them
+STATEMENT_CACHE_SIZE = 256
+
+# Parsed timestamps kept for reuse; rows written together (a decay pass, a
+# pruning pass) share the same stored timestamp string
+TIMESTAMP_CACHE_SIZE = 4096
+
+# Applied to each worker thread's long-lived database connection
+_CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=30000000000",
+    "PRAGMA cache_size=-64000",
+)
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize a vector or the rows of a matrix; zero vectors stay zero."""
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+def _encode_embedding(embedding: Optional[List[float]]) -> Optional[bytes]:
+    """Pack an embedding into a float16 BLOB for storage, as a unit vector."""
+    if not embedding:
+        return None
+    return _normalize(np.asarray(embedding, dtype=np.float32)).astype(np.float16).tobytes()
+
+def _decode_embedding(value: Optional[bytes]) -> Optional[List[float]]:
+    """Unpack an embedding stored as a float16 BLOB."""
+    if not value:
+        return None
+    return np.frombuffer(value, dtype=np.float16).tolist()
+
+# A buffered write: the table it touches and the operation to run
+PendingWrite = Tuple[str, Callable[[sqlite3.Connection], Any]]
+
+# Writes buffered by open transactions, per task: (manager, conversation id)
+# -> (owning task, buffered writes). Child tasks inherit the mapping, so the
+# owning task is checked before a buffer is used.
+_pending_writes: ContextVar[Optional[Dict[Tuple[Any, str], Tuple[asyncio.Task, List[PendingWrite]]]]] = ContextVar(
+    "conversation_memory_pending_writes", default=None
+)
+
+# datetimes are immutable, so parsed values can be shared between rows
+_parse_timestamp = lru_cache(maxsize=TIMESTAMP_CACHE_SIZE)(datetime.fromisoformat)
+
+def _materialize(rows: List[tuple], convert: Callable[[tuple], Any], kind: str) -> List[Any]:
+    """Convert rows in a single pass, retrying row by row only to skip invalid ones."""
+    try:
+        return [convert(row) for row in rows]
+    except Exception:
+        items = []
+        for row in rows:
+            try:
+                items.append(convert(row))
+            except Exception as e:
+                logger.error(f"Failed to deserialize {kind}: {e}")
+        return items
+
+def _row_to_relevance(row: tuple) -> MessageRelevance:
+    """Build a MessageRelevance from a message_relevance row."""
+    return MessageRelevance(
+        message_id=row[0],
+        base_relevance=row[1],
+        current_relevance=row[2],
+        decay_factor=row[3],
+        last_updated=_parse_timestamp(row[4]),
+        topic_relevance=from_json(row[5]) if row[5] else {},
+        priority=MemoryPriority(row[6]),
+        access_count=row[7],
+        last_accessed=_parse_timestamp(row[8]) if row[8] else None,
+        token_count=row[9] or 0
+    )
+
+def _row_to_topic(row: tuple) -> ConversationTopic:
+    """Build a ConversationTopic from a topics row."""
+    return ConversationTopic(
+        id=row[0],
+        name=row[1],
+        keywords=from_json(row[2]) if row[2] else [],
+        relevance_score=row[3],
+        confidence_score=row[4],
+        first_mention=_parse_timestamp(row[5]),
+        last_mention=_parse_timestamp(row[6]),
+        message_count=row[7],
+        embedding=_decode_embedding(row[8]),
+        parent_topic_id=row[9],
+        subtopic_ids=from_json(row[10]) if row[10] else []
+    )
+
+def _row_to_summary(row: tuple) -> ConversationSummary:
+    """Build a ConversationSummary from a summaries row."""
+    return ConversationSummary(
+        id=row[0],
+        conversation_id=row[1],
+        summary_type=row[2],
+        content=row[3],
+        key_points=from_json(row[4]) if row[4] else [],
+        covered_messages=from_json(row[5]) if row[5] else [],
+        covered_topics=from_json(row[6]) if row[6] else [],
+        compression_ratio=row[7],
+        token_count=row[8],
+        original_token_count=row[9],
+        relevance_score=row[10],
+        created_at=_parse_timestamp(row[11])
+    )
+
 class ConversationMemoryManager:
     """Advanced conversation memory manager with intelligent context management."""
     
@@ -46,14 +202,33 @@ class ConversationMemoryManager:
         self._init_database()
         
         # In-memory caches
-        self._conversation_states: Dict[str, ConversationState] = {}
-        self._message_relevance: Dict[str, MessageRelevance] = {}
-        self._topics: Dict[str, ConversationTopic] = {}
-        self._summaries: Dict[str, ConversationSummary] = {}
+        self._conversation_states: "OrderedDict[str, ConversationState]" = OrderedDict()
+        # Per-conversation deserialized rows by table, dropped whenever the
+        # conversation writes to that table
+        self._row_cache: "OrderedDict[str, Dict[str, List[Any]]]" = OrderedDict()
+        self._write_generation = 0
+        # Per-conversation stacked topic embeddings: (row per topic id, float32
+        # rows). Stored embeddings are unit vectors and never change once a
+        # topic exists, so new topics only append rows.
+        self._topic_matrices: "OrderedDict[str, Tuple[Dict[str, int], np.ndarray]]" = OrderedDict()
         
-        # Thread safety
+        # Thread safety: cache reads are lock-free, cache writes take the lock
         self._lock = Lock()
         self._executor = ThreadPoolExecutor(max_workers=4)
+        # SQLite allows one writer at a time, so commits get their own thread
+        # rather than waiting behind reads and embedding calls on the pool
+        self._write_executor = ThreadPoolExecutor(max_workers=1)
+        
+        # One write connection plus a read connection per executor thread;
+        # writes made inside _transaction are buffered per task (_pending_writes)
+        self._local = threading.local()
+        self._write_connection: Optional[sqlite3.Connection] = None
+        self._connections: List[sqlite3.Connection] = []
+        
+        # Committed writes go through a single background writer that groups
+        # everything queued while the previous commit ran into one transaction
+        self._write_queue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
         
         # Token encoder for context window management
         try:
@@ -61,6 +236,13 @@ class ConversationMemoryManager:
         except Exception as e:
             logger.warning(f"Could not load tiktoken encoder: {e}")
             self.tokenizer = None
+        self._exact_token_count = lru_cache(maxsize=TOKEN_COUNT_CACHE_SIZE)(self._encode_token_count)
+        # conversation_id -> [chars, tokens, samples] of exactly counted long texts
+        self._token_calibration: "OrderedDict[str, List[int]]" = OrderedDict()
+        
+        # Batched embedding requests, drained by a per-event-loop worker
+        self._embedding_queue: Optional[asyncio.Queue] = None
+        self._embedding_worker: Optional[asyncio.Task] = None
         
         # Configure Gemini for embeddings and summarization
         if self.settings.gemini_api_key:
@@ -106,9 +288,10 @@ class ConversationMemoryManager:
                     priority TEXT DEFAULT 'medium',
                     access_count INTEGER DEFAULT 0,
                     last_accessed TIMESTAMP,
+                    token_count INTEGER DEFAULT 0,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     FOREIGN KEY (conversation_id) REFERENCES conversation_states(conversation_id)
-                )
+                ) WITHOUT ROWID
             """)
             
             # Topics table
@@ -123,7 +306,7 @@ class ConversationMemoryManager:
                     first_mention TIMESTAMP,
                     last_mention TIMESTAMP,
                     message_count INTEGER DEFAULT 1,
-                    embedding TEXT,
+                    embedding BLOB,
                     parent_topic_id TEXT,
                     subtopic_ids TEXT,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -164,7 +347,7 @@ class ConversationMemoryManager:
                     bridging_context TEXT,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     FOREIGN KEY (conversation_id) REFERENCES conversation_states(conversation_id)
-                )
+                ) WITHOUT ROWID
             """)
             
             # Memory metrics table
@@ -186,40 +369,152 @@ class ConversationMemoryManager:
                 )
             """)
             
-            # Create indexes for performance
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_message_relevance_conversation ON message_relevance(conversation_id)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_topics_conversation ON topics(conversation_id)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_summaries_conversation ON summaries(conversation_id)")
+            # Databases created before per-message token counts lack the column
+            relevance_columns = {row[1] for row in cursor.execute("PRAGMA table_info(message_relevance)")}
+            if "token_count" not in relevance_columns:
+                cursor.execute("ALTER TABLE message_relevance ADD COLUMN token_count INTEGER DEFAULT 0")
+            
+            # Databases created before these tables were declared WITHOUT ROWID
+            # still have rowid tables; rebuild them (their indexes are recreated below)
+            for table, key_column in (("message_relevance", "message_id"), ("topic_transitions", "id")):
+                self._rebuild_without_rowid(conn, table, key_column)
+            
+            # Create indexes for performance; the per-conversation reads filter by
+            # conversation and sort, so they use composite indexes
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_relevance_conv_updated ON message_relevance(conversation_id, last_updated DESC)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_relevance_conv_score ON message_relevance(conversation_id, current_relevance DESC)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_topics_conv_mention ON topics(conversation_id, last_mention DESC)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_summaries_conv_created ON summaries(conversation_id, created_at DESC)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_transitions_conversation ON topic_transitions(conversation_id)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_message_relevance_updated ON message_relevance(last_updated)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_topics_last_mention ON topics(last_mention)")
             
+            # Superseded by the composite indexes above; no query filters on
+            # last_updated or last_mention alone
+            cursor.execute("DROP INDEX IF EXISTS idx_message_relevance_conversation")
+            cursor.execute("DROP INDEX IF EXISTS idx_topics_conversation")
+            cursor.execute("DROP INDEX IF EXISTS idx_summaries_conversation")
+            cursor.execute("DROP INDEX IF EXISTS idx_message_relevance_updated")
+            cursor.execute("DROP INDEX IF EXISTS idx_topics_last_mention")
+            
+            # Convert topic embeddings stored as JSON text by older versions to BLOBs
+            legacy_embeddings = cursor.execute(
+                "SELECT id, embedding FROM topics WHERE typeof(embedding) = 'text'"
+            ).fetchall()
+            if legacy_embeddings:
+                cursor.executemany(
+                    "UPDATE topics SET embedding = ? WHERE id = ?",
+                    [(_encode_embedding(from_json(embedding)), topic_id) for topic_id, embedding in legacy_embeddings]
+                )
+                logger.info(f"Converted {len(legacy_embeddings)} topic embeddings to BLOB storage")
+            
+            conn.commit()
+    
+    @staticmethod
+    def _rebuild_without_rowid(conn: sqlite3.Connection, table: str, key_column: str) -> None:
+        """Copy a rowid table into a WITHOUT ROWID table of the same definition and swap it in."""
+        (create_sql,) = conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+        ).fetchone()
+        if create_sql.rstrip().upper().endswith("WITHOUT ROWID"):
+            return
+        
+        # The stored definition includes columns added by ALTER TABLE, so the
+        # rebuilt table has the same columns in the same order
+        rebuilt = f"{table}_without_rowid"
+        conn.commit()
+        conn.execute("BEGIN")
+        try:
+            conn.execute(f"DROP TABLE IF EXISTS {rebuilt}")
+            conn.execute(create_sql.replace(table, rebuilt, 1) + " WITHOUT ROWID")
+            # A rowid table tolerates NULL text keys; a WITHOUT ROWID one does not
+            conn.execute(f"INSERT INTO {rebuilt} SELECT * FROM {table} WHERE {key_column} IS NOT NULL")
+            conn.execute(f"DROP TABLE {table}")
+            conn.execute(f"ALTER TABLE {rebuilt} RENAME TO {table}")
             conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        logger.info(f"Rebuilt {table} as a WITHOUT ROWID table")
     
-    def _count_tokens(self, text: str) -> int:
-        """Count tokens in text."""
-        if self.tokenizer:
-            return len(self.tokenizer.encode(text))
-        else:
+    def _count_tokens(self, text: str, conversation_id: Optional[str] = None,
+                      exact: bool = False) -> int:
+        """Count tokens in text, estimating a conversation's long texts unless an exact count is required."""
+        if not self.tokenizer:
             # Fallback estimation: roughly 4 characters per token
             return len(text) // 4
+        
+        if exact or conversation_id is None or len(text) <= TOKEN_ESTIMATE_MIN_CHARS:
+            return self._exact_token_count(text)
+        
+        calibration = self._token_calibration.get(conversation_id)
+        if calibration is not None and calibration[2] >= TOKEN_CALIBRATION_SAMPLES:
+            return int(len(text) * calibration[1] / calibration[0])
+        
+        # Still calibrating: count exactly and add the sample to the running totals
+        count = self._exact_token_count(text)
+        with self._lock:
+            calibration = self._token_calibration.get(conversation_id)
+            if calibration is None:
+                calibration = self._token_calibration[conversation_id] = [0, 0, 0]
+                if len(self._token_calibration) > CONVERSATION_CACHE_SIZE:
+                    self._token_calibration.popitem(last=False)
+            calibration[0] += len(text)
+            calibration[1] += count
+            calibration[2] += 1
+        return count
+    
+    def _encode_token_count(self, text: str) -> int:
+        """Count tokens with a full BPE encoding pass."""
+        return len(self.tokenizer.encode_ordinary(text))
     
     async def _get_embedding(self, text: str) -> Optional[List[float]]:
-        """Generate embedding for text using Gemini."""
-        try:
-            if not self.settings.gemini_api_key:
-                return None
-            
-            # Use Gemini's text embedding model
-            result = genai.embed_content(
-                model="models/text-embedding-004",
-                content=text,
-                task_type="semantic_similarity"
-            )
-            return result['embedding']
-        except Exception as e:
-            logger.error(f"Failed to generate embedding: {e}")
+        """Generate embedding for text using Gemini, batched with concurrent requests."""
+        if not self.settings.gemini_api_key:
             return None
+        
+        loop = asyncio.get_running_loop()
+        if (self._embedding_worker is None or self._embedding_worker.done()
+                or self._embedding_worker.get_loop() is not loop):
+            self._embedding_queue = asyncio.Queue()
+            self._embedding_worker = loop.create_task(self._embedding_loop(self._embedding_queue))
+        
+        future = loop.create_future()
+        await self._embedding_queue.put((text, future))
+        return await future
+    
+    async def _embedding_loop(self, queue: asyncio.Queue) -> None:
+        """Drain queued embedding requests and resolve them with one batched call."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            
+            # Let concurrent requests join the batch
+            await asyncio.sleep(EMBEDDING_BATCH_WAIT_SECONDS)
+            while len(batch) < EMBEDDING_BATCH_SIZE:
+                try:
+                    batch.append(queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            
+            try:
+                embeddings = await loop.run_in_executor(
+                    self._executor, self._embed_batch, [text for text, _ in batch]
+                )
+            except Exception as e:
+                logger.error(f"Failed to generate embedding: {e}")
+                embeddings = [None] * len(batch)
+            
+            for (_, future), embedding in zip(batch, embeddings):
+                if not future.done():
+                    future.set_result(embedding)
+    
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """Embed a batch of texts with Gemini's text embedding model."""
+        result = genai.embed_content(
+            model=EMBEDDING_MODEL,
+            content=texts,
+            task_type="semantic_similarity"
+        )
+        return result['embedding']
     
     async def initialize_conversation(self, conversation_id: str, config: Optional[ConversationMemoryConfig] = None) -> ConversationState:
         """Initialize a new conversation with memory management."""
@@ -239,16 +534,14 @@ class ConversationMemoryManager:
             memory_config=memory_config
         )
         
-        # Store in database
-        await self._save_conversation_state(state)
+        # Store the state and initial metrics in database together; if either
+        # write fails neither is committed
+        async with self._transaction(conversation_id):
+            await self._save_conversation_state(state)
+            await self._save_memory_metrics(MemoryMetrics(conversation_id=conversation_id))
         
         # Cache in memory
-        with self._lock:
-            self._conversation_states[conversation_id] = state
-        
-        # Initialize metrics
-        metrics = MemoryMetrics(conversation_id=conversation_id)
-        await self._save_memory_metrics(metrics)
+        self._cache_conversation_state(state)
         
         logger.info(f"Initialized conversation memory for {conversation_id}")
         return state
@@ -257,17 +550,36 @@ class ConversationMemoryManager:
         """Add a new message to conversation memory."""
         start_time = time.time()
         
+        # Commit all of this message's database writes together
+        async with self._transaction(conversation_id):
+            summarize_in_background = await self._add_message(conversation_id, message, start_time)
+        
+        if summarize_in_background:
+            # Started only once the message's writes are committed: the task has
+            # no access to the transaction's buffer and must not see (or save)
+            # changes that could still be discarded
+            asyncio.create_task(self._generate_conversation_summary(conversation_id))
+        
+        logger.debug(f"Added message {message.id} to conversation {conversation_id}")
+    
+    async def _add_message(self, conversation_id: str, message: ChatMessage, start_time: float) -> bool:
+        """Record a message's relevance, topics and state updates.
+        
+        Returns whether a background summary is due once the writes commit.
+        """
         # Get or create conversation state
         state = await self.get_conversation_state(conversation_id)
         if not state:
             state = await self.initialize_conversation(conversation_id)
         
         # Create message relevance record
+        token_count = self._count_tokens(message.content, conversation_id)
         relevance = MessageRelevance(
             message_id=message.id,
             base_relevance=1.0,
             current_relevance=1.0,
-            priority=MemoryPriority.HIGH if message.role == MessageRole.USER else MemoryPriority.MEDIUM
+            priority=MemoryPriority.HIGH if message.role == MessageRole.USER else MemoryPriority.MEDIUM,
+            token_count=token_count
         )
         
         # Store message relevance
@@ -281,7 +593,7 @@ class ConversationMemoryManager:
         
         # Add to context window
         state.context_window.active_messages.append(message.id)
-        state.context_window.current_token_count += self._count_tokens(message.content)
+        state.context_window.current_token_count += token_count
         
         # Extract and track topics
         await self._extract_and_track_topics(conversation_id, message)
@@ -291,10 +603,11 @@ class ConversationMemoryManager:
             await self._manage_context_window(conversation_id)
         
         # Check if summarization is needed
+        summarize_in_background = False
         if state.message_count % state.memory_config.summary_threshold == 0:
             if state.memory_config.enable_background_processing:
-                # Schedule background summarization
-                asyncio.create_task(self._generate_conversation_summary(conversation_id))
+                # Scheduled by the caller after the commit
+                summarize_in_background = True
             else:
                 await self._generate_conversation_summary(conversation_id)
         
@@ -304,8 +617,7 @@ class ConversationMemoryManager:
         # Update metrics
         processing_time = (time.time() - start_time) * 1000
         await self._update_memory_metrics(conversation_id, processing_time)
-        
-        logger.debug(f"Added message {message.id} to conversation {conversation_id}")
+        return summarize_in_background
     
     async def _extract_and_track_topics(self, conversation_id: str, message: ChatMessage) -> None:
         """Extract topics from message and track topic changes."""
@@ -324,7 +636,7 @@ class ConversationMemoryManager:
             
             # Check for existing similar topics
             existing_topics = await self._get_topics_for_conversation(conversation_id)
-            similar_topic = await self._find_similar_topic(embedding, existing_topics)
+            similar_topic = await self._find_similar_topic(embedding, existing_topics, conversation_id)
             
             state = await self.get_conversation_state(conversation_id)
             
@@ -379,45 +691,96 @@ class ConversationMemoryManager:
     def _extract_keywords(self, text: str) -> List[str]:
         """Extract keywords from text (simplified implementation)."""
         # In production, use more sophisticated NLP libraries like spaCy or NLTK
-        import re
-        
-        # Remove common stop words
-        stop_words = {
-            'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by',
-            'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him', 'her', 'us', 'them',
-            'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 'do', 'does', 'did',
-            'will', 'would', 'could', 'should', 'may', 'might', 'can', 'cannot', 'this', 'that', 'these', 'those'
-        }
-        
-        # Extract words and filter
-        words = re.findall(r'\b[a-zA-Z]{3,}\b', text.lower())
-        keywords = [word for word in words if word not in stop_words]
+        # One scan both tokenizes and drops stop words, which match with an empty group
+        counter = Counter(word for word in _KEYWORD_PATTERN.findall(text.lower()) if word)
         
         # Return most frequent keywords
-        from collections import Counter
-        counter = Counter(keywords)
         return [word for word, count in counter.most_common(10)]
     
-    async def _find_similar_topic(self, embedding: List[float], topics: List[ConversationTopic]) -> Optional[ConversationTopic]:
+    async def _find_similar_topic(
+        self,
+        embedding: List[float],
+        topics: List[ConversationTopic],
+        conversation_id: Optional[str] = None
+    ) -> Optional[ConversationTopic]:
         """Find the most similar existing topic."""
         if not topics or not embedding:
             return None
         
-        best_topic = None
-        best_similarity = 0.0
+        embedded_topics, scores = await self._score_topics(conversation_id, topics, embedding)
+        if not embedded_topics:
+            return None
         
-        for topic in topics:
-            if topic.embedding:
-                similarity = cosine_similarity([embedding], [topic.embedding])[0][0]
-                if similarity > best_similarity:
-                    best_similarity = similarity
-                    best_topic = topic
+        best_index = int(scores.argmax())
+        best_similarity = float(scores[best_index])
         
-        if best_topic and best_similarity > self.config.topic_similarity_threshold:
-            return best_topic
+        if best_similarity > 0.0 and best_similarity > self.config.topic_similarity_threshold:
+            return embedded_topics[best_index]
         
         return None
     
+    async def _score_topics(
+        self,
+        conversation_id: Optional[str],
+        topics: List[ConversationTopic],
+        embedding: List[float]
+    ) -> Tuple[List[ConversationTopic], np.ndarray]:
+        """Get topics with embeddings and their cosine similarity to an embedding."""
+        if len(topics) > LARGE_TOPIC_COUNT:
+            # NumPy releases the GIL for the matmul, so large conversations are
+            # scored on a worker thread without stalling the event loop
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, self._compute_topic_scores, conversation_id, topics, embedding
+            )
+        return self._compute_topic_scores(conversation_id, topics, embedding)
+    
+    def _compute_topic_scores(
+        self,
+        conversation_id: Optional[str],
+        topics: List[ConversationTopic],
+        embedding: List[float]
+    ) -> Tuple[List[ConversationTopic], np.ndarray]:
+        """Score topics with embeddings against an embedding using the cached topic matrix."""
+        embedded_topics = [topic for topic in topics if topic.embedding]
+        if not embedded_topics:
+            return embedded_topics, np.empty(0, dtype=np.float32)
+        
+        row_index, matrix = self._get_topic_matrix(conversation_id, embedded_topics)
+        
+        # One matrix-vector product scores every cached topic at once
+        scores = matrix @ _normalize(np.asarray(embedding, dtype=np.float32))
+        return embedded_topics, scores[[row_index[topic.id] for topic in embedded_topics]]
+    
+    def _get_topic_matrix(
+        self,
+        conversation_id: Optional[str],
+        embedded_topics: List[ConversationTopic]
+    ) -> Tuple[Dict[str, int], np.ndarray]:
+        """Get the stacked topic embeddings and their row per topic id, adding rows for new topics."""
+        cached = self._topic_matrices.get(conversation_id) if conversation_id else None
+        row_index, matrix = cached if cached is not None else ({}, None)
+        
+        new_topics = [topic for topic in embedded_topics if topic.id not in row_index]
+        if not new_topics:
+            return row_index, matrix
+        
+        # Stored embeddings are already unit vectors, so rows are used as-is.
+        # The cached index and matrix are replaced, never mutated, so lock-free
+        # readers always see a consistent pair.
+        new_rows = np.asarray([topic.embedding for topic in new_topics], dtype=np.float32)
+        row_index = dict(row_index)
+        for topic in new_topics:
+            row_index[topic.id] = len(row_index)
+        matrix = new_rows if matrix is None else np.vstack((matrix, new_rows))
+        
+        if conversation_id:
+            with self._lock:
+                self._topic_matrices[conversation_id] = (row_index, matrix)
+                self._topic_matrices.move_to_end(conversation_id)
+                if len(self._topic_matrices) > CONVERSATION_CACHE_SIZE:
+                    self._topic_matrices.popitem(last=False)
+        return row_index, matrix
+    
     async def _record_topic_transition(
         self, 
         conversation_id: str, 
@@ -448,36 +811,27 @@ class ConversationMemoryManager:
         # Apply relevance decay to all messages
         await self._apply_relevance_decay(conversation_id)
         
-        # Get current message relevances
-        message_relevances = await self._get_message_relevances_for_conversation(conversation_id)
-        
-        # Sort by relevance score (lowest first for pruning)
-        sorted_relevances = sorted(message_relevances, key=lambda x: x.current_relevance)
-        
         # Calculate target token reduction
         current_tokens = state.context_window.current_token_count
         target_tokens = int(state.context_window.max_token_limit * 0.7)  # Reduce to 70% capacity
         tokens_to_remove = current_tokens - target_tokens
         
-        # Prune low-relevance messages
-        removed_tokens = 0
-        messages_to_archive = []
-        
-        for relevance in sorted_relevances:
-            if removed_tokens >= tokens_to_remove:
-                break
-            
-            if relevance.priority not in [MemoryPriority.CRITICAL, MemoryPriority.HIGH]:
-                # Estimate token count for this message (simplified)
-                estimated_tokens = 50  # Average message size
-                messages_to_archive.append(relevance.message_id)
-                removed_tokens += estimated_tokens
+        # Select low-relevance messages to prune
+        pruned = await self._select_messages_to_prune(
+            conversation_id, state.context_window.active_messages, tokens_to_remove
+        )
+        messages_to_archive = [message_id for message_id, _ in pruned]
+        removed_tokens = sum(message_tokens for _, message_tokens in pruned)
         
         # Move messages to archive
-        for message_id in messages_to_archive:
-            if message_id in state.context_window.active_messages:
-                state.context_window.active_messages.remove(message_id)
-                state.context_window.archived_messages.append(message_id)
+        active = set(state.context_window.active_messages)
+        archived = set(messages_to_archive)
+        state.context_window.archived_messages.extend(
+            message_id for message_id in messages_to_archive if message_id in active
+        )
+        state.context_window.active_messages = [
+            message_id for message_id in state.context_window.active_messages if message_id not in archived
+        ]
         
         # Update token count
         state.context_window.current_token_count -= removed_tokens
@@ -490,31 +844,44 @@ class ConversationMemoryManager:
     
     async def _apply_relevance_decay(self, conversation_id: str, decay_type: DecayType = DecayType.COMBINED) -> None:
         """Apply relevance decay to conversation messages."""
-        message_relevances = await self._get_message_relevances_for_conversation(conversation_id)
-        now = datetime.now(timezone.utc)
+        now = datetime.now(timezone.utc).isoformat()
         
-        for relevance in message_relevances:
-            original_relevance = relevance.current_relevance
+        def _db_operation(conn: sqlite3.Connection):
+            # Hours since each message's last update are computed by SQLite;
+            # timestamps without an offset are UTC
+            rows = conn.execute("""
+                SELECT message_id, current_relevance, base_relevance,
+                       (julianday(?) - julianday(last_updated)) * 24.0
+                FROM message_relevance WHERE conversation_id = ?
+            """, (now, conversation_id)).fetchall()
+            if not rows:
+                return
+            
+            message_ids, current, base, hours = zip(*rows)
+            relevance = np.array(current, dtype=np.float64)
             
             if decay_type in [DecayType.TEMPORAL, DecayType.COMBINED]:
                 # Temporal decay based on time elapsed
-                time_diff = (now - relevance.last_updated).total_seconds() / 3600  # hours
-                temporal_decay = math.exp(-time_diff / self.config.temporal_decay_hours)
-                relevance.current_relevance *= temporal_decay
+                # Timestamps ahead of now (clock skew) must not raise relevance
+                elapsed = np.maximum(np.array(hours, dtype=np.float64), 0.0)
+                relevance *= np.exp(-elapsed / self.config.temporal_decay_hours)
             
             if decay_type in [DecayType.POSITIONAL, DecayType.COMBINED]:
                 # Positional decay based on message position (simplified)
-                positional_decay = self.config.relevance_decay_factor
-                relevance.current_relevance *= positional_decay
+                relevance *= self.config.relevance_decay_factor
             
-            # Update decay factor
-            relevance.decay_factor = relevance.current_relevance / relevance.base_relevance
-            relevance.last_updated = now
+            # A zero base relevance has fully decayed
+            base = np.array(base, dtype=np.float64)
+            decay_factor = np.divide(relevance, base, out=np.zeros_like(relevance), where=base > 0)
+            conn.executemany("""
+                UPDATE message_relevance
+                SET current_relevance = ?, decay_factor = ?, last_updated = ?
+                WHERE message_id = ?
+            """, zip(relevance.tolist(), decay_factor.tolist(), repeat(now), message_ids))
             
-            # Save updated relevance
-            await self._save_message_relevance(conversation_id, relevance)
+            logger.debug(f"Applied {decay_type.value} decay to {len(rows)} messages")
         
-        logger.debug(f"Applied {decay_type.value} decay to {len(message_relevances)} messages")
+        await self._write(conversation_id, "message_relevance", _db_operation)
     
     async def _generate_conversation_summary(self, conversation_id: str) -> Optional[ConversationSummary]:
         """Generate a conversation summary."""
@@ -538,8 +905,8 @@ class ConversationMemoryManager:
                 content=summary_content,
                 covered_messages=recent_message_ids,
                 compression_ratio=self.config.memory_compression_ratio,
-                token_count=self._count_tokens(summary_content),
-                original_token_count=len(recent_message_ids) * 100  # Estimated
+                token_count=self._count_tokens(summary_content, exact=True),
+                original_token_count=await self._get_message_token_total(conversation_id, recent_message_ids)
             )
             
             await self._save_summary(summary)
@@ -558,18 +925,25 @@ class ConversationMemoryManager:
     async def get_conversation_state(self, conversation_id: str) -> Optional[ConversationState]:
         """Get conversation state."""
         # Check cache first
-        with self._lock:
-            if conversation_id in self._conversation_states:
-                return self._conversation_states[conversation_id]
+        state = self._conversation_states.get(conversation_id)
+        if state is not None:
+            return state
         
         # Load from database
         state = await self._load_conversation_state(conversation_id)
         if state:
-            with self._lock:
-                self._conversation_states[conversation_id] = state
+            self._cache_conversation_state(state)
         
         return state
     
+    def _cache_conversation_state(self, state: ConversationState) -> None:
+        """Cache a conversation state, evicting the least recently cached conversation."""
+        with self._lock:
+            self._conversation_states[state.conversation_id] = state
+            self._conversation_states.move_to_end(state.conversation_id)
+            if len(self._conversation_states) > CONVERSATION_CACHE_SIZE:
+                self._conversation_states.popitem(last=False)
+    
     async def get_relevant_context(self, conversation_id: str, query: str, max_tokens: int = 8000) -> Dict[str, Any]:
         """Get relevant conversation context for a query."""
         state = await self.get_conversation_state(conversation_id)
@@ -580,33 +954,27 @@ class ConversationMemoryManager:
         query_embedding = await self._get_embedding(query)
         
         # Get relevant messages based on current relevance scores
-        message_relevances = await self._get_message_relevances_for_conversation(conversation_id)
-        relevant_messages = sorted(
-            [r for r in message_relevances if r.current_relevance > 0.3],
-            key=lambda x: x.current_relevance,
-            reverse=True
-        )
+        relevant_message_ids = await self._get_relevant_message_ids(conversation_id, min_relevance=0.3, limit=20)
         
         # Get relevant topics
         topics = await self._get_topics_for_conversation(conversation_id)
         relevant_topics = []
         
         if query_embedding:
-            for topic in topics:
-                if topic.embedding:
-                    similarity = cosine_similarity([query_embedding], [topic.embedding])[0][0]
-                    if similarity > 0.5:
-                        relevant_topics.append((topic, similarity))
-            
-            relevant_topics = sorted(relevant_topics, key=lambda x: x[1], reverse=True)
-            relevant_topics = [topic for topic, _ in relevant_topics[:5]]
+            embedded_topics, scores = await self._score_topics(conversation_id, topics, query_embedding)
+            if embedded_topics:
+                # Top five scores above the threshold, best first
+                top = min(5, len(scores))
+                indices = np.argpartition(-scores, top - 1)[:top]
+                indices = indices[np.argsort(-scores[indices], kind="stable")]
+                relevant_topics = [embedded_topics[i] for i in indices if scores[i] > 0.5]
         
         # Get relevant summaries
         summaries = await self._get_summaries_for_conversation(conversation_id)
         relevant_summaries = sorted(summaries, key=lambda x: x.relevance_score, reverse=True)[:3]
         
         return {
-            "messages": [r.message_id for r in relevant_messages[:20]],
+            "messages": relevant_message_ids,
             "topics": relevant_topics,
             "summaries": relevant_summaries,
             "context_window": state.context_window,
@@ -614,380 +982,651 @@ class ConversationMemoryManager:
         }
     
     # Database operations
+    def _open_connection(self) -> sqlite3.Connection:
+        """Open a long-lived database connection and register it for close()."""
+        # Connections are closed from the caller's thread after the executors
+        # stop, so they are never used by two threads at once.
+        # Autocommit mode: sqlite3 never opens transactions implicitly, so
+        # writes are bracketed explicitly and reads never hold a transaction
+        conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE,
+            isolation_level=None
+        )
+        for pragma in _CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        with self._lock:
+            self._connections.append(conn)
+        return conn
+    
+    def _get_connection(self) -> sqlite3.Connection:
+        """Get the calling thread's read connection."""
+        conn = getattr(self._local, "connection", None)
+        if conn is None:
+            conn = self._open_connection()
+            self._local.connection = conn
+        return conn
+    
+    def _get_write_connection(self) -> sqlite3.Connection:
+        """Get the single connection all writes are committed through."""
+        # Only the background writer and read-throughs call this, one at a
+        # time on the write executor's single thread
+        if self._write_connection is None:
+            self._write_connection = self._open_connection()
+        return self._write_connection
+    
+    def close(self) -> None:
+        """Stop the worker threads, then optimize and close their database connections."""
+        self._executor.shutdown(wait=True)
+        self._write_executor.shutdown(wait=True)
+        with self._lock:
+            connections, self._connections = self._connections, []
+        self._write_connection = None
+        for conn in connections:
+            try:
+                conn.execute("PRAGMA optimize")
+            except sqlite3.Error as e:
+                logger.warning(f"Could not optimize conversation memory database: {e}")
+            finally:
+                conn.close()
+    
+    def _run_writes(self, writes: List[Callable[[sqlite3.Connection], Any]]) -> None:
+        """Apply writes in a single transaction on the write connection (runs in a worker thread)."""
+        conn = self._get_write_connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for operation in writes:
+                operation(conn)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+    
+    def _run_read_through(
+        self,
+        writes: List[Callable[[sqlite3.Connection], Any]],
+        read: Callable[[sqlite3.Connection], Any]
+    ) -> Any:
+        """Run a read over uncommitted writes, then roll them back (runs on the write thread)."""
+        conn = self._get_write_connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for operation in writes:
+                operation(conn)
+            return read(conn)
+        finally:
+            conn.execute("ROLLBACK")
+    
+    def _run_read(self, read: Callable[[sqlite3.Connection], Any]) -> Any:
+        """Run a read on the calling thread's read connection (runs in a worker thread)."""
+        return read(self._get_connection())
+    
+    def _pending(self, conversation_id: str) -> Optional[List[PendingWrite]]:
+        """Get the current task's buffered writes to a conversation, if it has a transaction open."""
+        buffers = _pending_writes.get()
+        if buffers:
+            entry = buffers.get((self, conversation_id))
+            if entry is not None and entry[0] is asyncio.current_task():
+                return entry[1]
+        return None
+    
+    @asynccontextmanager
+    async def _transaction(self, conversation_id: str):
+        """Buffer the current task's writes to a conversation and commit them together.
+        
+        The writes are committed in one transaction when the block succeeds and
+        discarded when it raises. Nested blocks join the outermost one; an
+        exception leaving a nested block discards only the writes made in it.
+        """
+        pending = self._pending(conversation_id)
+        if pending is not None:
+            savepoint = list(pending)
+            try:
+                yield
+            except BaseException:
+                pending[:] = savepoint
+                self._discard_cached(conversation_id)
+                raise
+            return
+        
+        pending: List[PendingWrite] = []
+        buffers = dict(_pending_writes.get() or {})
+        buffers[(self, conversation_id)] = (asyncio.current_task(), pending)
+        token = _pending_writes.set(buffers)
+        try:
+            yield
+        except BaseException:
+            self._discard_cached(conversation_id)
+            raise
+        finally:
+            _pending_writes.reset(token)
+        
+        if pending:
+            try:
+                await self._commit_writes([operation for _, operation in pending])
+            except BaseException:
+                self._discard_cached(conversation_id)
+                raise
+            # Rows cached by other tasks before the commit are now stale
+            self._invalidate_rows(conversation_id, {table for table, _ in pending})
+    
+    def _invalidate_rows(self, conversation_id: str, tables: Set[str]) -> None:
+        """Drop a conversation's cached rows for tables that were written."""
+        self._write_generation += 1
+        cached = self._row_cache.get(conversation_id)
+        if cached is not None:
+            for table in tables:
+                cached.pop(table, None)
+    
+    def _discard_cached(self, conversation_id: str) -> None:
+        """Forget in-memory copies of a conversation whose writes were discarded."""
+        self._write_generation += 1
+        with self._lock:
+            self._conversation_states.pop(conversation_id, None)
+            self._row_cache.pop(conversation_id, None)
+            self._topic_matrices.pop(conversation_id, None)
+    
+    async def _write(
+        self,
+        conversation_id: str,
+        table: str,
+        operation: Callable[[sqlite3.Connection], Any],
+        supersedes_pending: bool = False
+    ) -> None:
+        """Run a write, or buffer it while the current task has a transaction open.
+        
+        With supersedes_pending, the write replaces the transaction's buffered
+        writes to the same table instead of queuing behind them.
+        """
+        self._invalidate_rows(conversation_id, {table})
+        
+        pending = self._pending(conversation_id)
+        if pending is not None:
+            if supersedes_pending:
+                pending[:] = [entry for entry in pending if entry[0] != table]
+            pending.append((table, operation))
+            return
+        await self._commit_writes([operation])
+    
+    async def _commit_writes(self, operations: List[Callable[[sqlite3.Connection], Any]]) -> None:
+        """Queue writes for the background writer and wait until they are committed."""
+        loop = asyncio.get_running_loop()
+        if (self._writer_task is None or self._writer_task.done()
+                or self._writer_task.get_loop() is not loop):
+            self._write_queue = asyncio.Queue()
+            self._writer_task = loop.create_task(self._writer_loop(self._write_queue))
+        
+        future = loop.create_future()
+        await self._write_queue.put((operations, future))
+        await future
+    
+    async def _writer_loop(self, queue: asyncio.Queue) -> None:
+        """Drain queued write groups and commit them in one transaction."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            
+            # Let writes from concurrent turns join the transaction
+            await asyncio.sleep(WRITE_BATCH_WAIT_SECONDS)
+            while len(batch) < WRITE_BATCH_SIZE:
+                try:
+                    batch.append(queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            
+            try:
+                await loop.run_in_executor(
+                    self._write_executor, self._run_writes,
+                    [operation for operations, _ in batch for operation in operations]
+                )
+                errors = [None] * len(batch)
+            except Exception as e:
+                if len(batch) == 1:
+                    errors = [e]
+                else:
+                    # Retry each group on its own so a failing write only fails its caller
+                    errors = []
+                    for operations, _ in batch:
+                        try:
+                            await loop.run_in_executor(self._write_executor, self._run_writes, operations)
+                            errors.append(None)
+                        except Exception as group_error:
+                            errors.append(group_error)
+            
+            for (_, future), error in zip(batch, errors):
+                if future.done():
+                    continue
+                if error is None:
+                    future.set_result(None)
+                else:
+                    future.set_exception(error)
+    
+    def _has_pending(self, conversation_id: str, table: str) -> bool:
+        """Whether the current task's open transaction has buffered writes to a table."""
+        pending = self._pending(conversation_id)
+        return bool(pending) and any(pending_table == table for pending_table, _ in pending)
+    
+    async def _read(self, conversation_id: str, table: str, operation: Callable[[sqlite3.Connection], Any]) -> Any:
+        """Run a read; inside a transaction it also sees the transaction's buffered writes."""
+        loop = asyncio.get_running_loop()
+        if self._has_pending(conversation_id, table):
+            writes = [pending_operation for _, pending_operation in self._pending(conversation_id)]
+            return await loop.run_in_executor(self._write_executor, self._run_read_through, writes, operation)
+        return await loop.run_in_executor(self._executor, self._run_read, operation)
+    
+    async def _read_rows(self, conversation_id: str, table: str, operation: Callable[[sqlite3.Connection], List[Any]]) -> List[Any]:
+        """Read a conversation's rows from a table, reusing them until the next write to it."""
+        cached = self._row_cache.get(conversation_id)
+        if cached is not None and table in cached:
+            return list(cached[table])
+        
+        generation = self._write_generation
+        rows = await self._read(conversation_id, table, operation)
+        if generation == self._write_generation and not self._has_pending(conversation_id, table):
+            # No write raced the read and it saw no uncommitted writes, so the
+            # rows are current
+            with self._lock:
+                self._row_cache.setdefault(conversation_id, {})[table] = rows
+                self._row_cache.move_to_end(conversation_id)
+                if len(self._row_cache) > CONVERSATION_CACHE_SIZE:
+                    self._row_cache.popitem(last=False)
+        return list(rows)
+    
     async def _save_conversation_state(self, state: ConversationState) -> None:
         """Save conversation state to database."""
-        def _db_operation():
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    INSERT OR REPLACE INTO conversation_states (
-                        conversation_id, current_topic_id, previous_topic_id, topic_history,
-                        message_count, turn_count, session_start, last_activity,
-                        context_window, memory_config, is_archived, archive_reason, updated_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    state.conversation_id,
-                    state.current_topic_id,
-                    state.previous_topic_id,
-                    json.dumps(state.topic_history),
-                    state.message_count,
-                    state.turn_count,
-                    state.session_start.isoformat(),
-                    state.last_activity.isoformat(),
-                    state.context_window.model_dump_json(),
-                    state.memory_config.model_dump_json(),
-                    state.is_archived,
-                    state.archive_reason,
-                    datetime.now(timezone.utc).isoformat()
-                ))
-                conn.commit()
-        
-        await asyncio.get_event_loop().run_in_executor(self._executor, _db_operation)
+        # Serialize now: a buffered write must store the state as it is at this
+        # save, not whatever the live object holds when the transaction commits
+        row = (
+            state.conversation_id,
+            state.current_topic_id,
+            state.previous_topic_id,
+            to_json(state.topic_history),
+            state.message_count,
+            state.turn_count,
+            state.session_start.isoformat(),
+            state.last_activity.isoformat(),
+            to_json(state.context_window),
+            to_json(state.memory_config),
+            state.is_archived,
+            state.archive_reason,
+            datetime.now(timezone.utc).isoformat()
+        )
+        
+        def _db_operation(conn: sqlite3.Connection):
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT OR REPLACE INTO conversation_states (
+                    conversation_id, current_topic_id, previous_topic_id, topic_history,
+                    message_count, turn_count, session_start, last_activity,
+                    context_window, memory_config, is_archived, archive_reason, updated_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, row)
+        
+        # Each save holds a full snapshot of the state, so a later save of the
+        # same conversation makes any buffered one redundant
+        await self._write(state.conversation_id, "conversation_states", _db_operation, supersedes_pending=True)
     
     async def _load_conversation_state(self, conversation_id: str) -> Optional[ConversationState]:
         """Load conversation state from database."""
-        def _db_operation():
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT current_topic_id, previous_topic_id, topic_history, message_count,
-                           turn_count, session_start, last_activity, context_window,
-                           memory_config, is_archived, archive_reason
-                    FROM conversation_states WHERE conversation_id = ?
-                """, (conversation_id,))
-                
-                row = cursor.fetchone()
-                if not row:
-                    return None
-                
-                try:
-                    context_window_data = json.loads(row[7])
-                    memory_config_data = json.loads(row[8])
-                    
-                    return ConversationState(
-                        conversation_id=conversation_id,
-                        current_topic_id=row[0],
-                        previous_topic_id=row[1],
-                        topic_history=json.loads(row[2]) if row[2] else [],
-                        message_count=row[3],
-                        turn_count=row[4],
-                        session_start=datetime.fromisoformat(row[5]),
-                        last_activity=datetime.fromisoformat(row[6]),
-                        context_window=ContextWindow(**context_window_data),
-                        memory_config=ConversationMemoryConfig(**memory_config_data),
-                        is_archived=bool(row[9]),
-                        archive_reason=row[10]
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to deserialize conversation state: {e}")
-                    return None
+        def _db_operation(conn: sqlite3.Connection):
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT current_topic_id, previous_topic_id, topic_history, message_count,
+                       turn_count, session_start, last_activity, context_window,
+                       memory_config, is_archived, archive_reason
+                FROM conversation_states WHERE conversation_id = ?
+            """, (conversation_id,))
+            
+            row = cursor.fetchone()
+            if not row:
+                return None
+            
+            try:
+                return ConversationState(
+                    conversation_id=conversation_id,
+                    current_topic_id=row[0],
+                    previous_topic_id=row[1],
+                    topic_history=from_json(row[2]) if row[2] else [],
+                    message_count=row[3],
+                    turn_count=row[4],
+                    session_start=_parse_timestamp(row[5]),
+                    last_activity=_parse_timestamp(row[6]),
+                    context_window=ContextWindow.model_validate_json(row[7]),
+                    memory_config=ConversationMemoryConfig.model_validate_json(row[8]),
+                    is_archived=bool(row[9]),
+                    archive_reason=row[10]
+                )
+            except Exception as e:
+                logger.error(f"Failed to deserialize conversation state: {e}")
+                return None
         
-        return await asyncio.get_event_loop().run_in_executor(self._executor, _db_operation)
+        return await self._read(conversation_id, "conversation_states", _db_operation)
     
     async def _save_message_relevance(self, conversation_id: str, relevance: MessageRelevance) -> None:
         """Save message relevance to database."""
-        def _db_operation():
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    INSERT OR REPLACE INTO message_relevance (
-                        message_id, conversation_id, base_relevance, current_relevance,
-                        decay_factor, last_updated, topic_relevance, priority,
-                        access_count, last_accessed
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    relevance.message_id,
-                    conversation_id,
-                    relevance.base_relevance,
-                    relevance.current_relevance,
-                    relevance.decay_factor,
-                    relevance.last_updated.isoformat(),
-                    json.dumps(relevance.topic_relevance),
-                    relevance.priority.value,
-                    relevance.access_count,
-                    relevance.last_accessed.isoformat() if relevance.last_accessed else None
-                ))
-                conn.commit()
-        
-        await asyncio.get_event_loop().run_in_executor(self._executor, _db_operation)
-    
-    async def _get_message_relevances_for_conversation(self, conversation_id: str) -> List[MessageRelevance]:
-        """Get all message relevances for a conversation."""
-        def _db_operation():
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT message_id, base_relevance, current_relevance, decay_factor,
-                           last_updated, topic_relevance, priority, access_count, last_accessed
-                    FROM message_relevance WHERE conversation_id = ?
-                    ORDER BY last_updated DESC
-                """, (conversation_id,))
-                
-                relevances = []
-                for row in cursor.fetchall():
-                    try:
-                        relevances.append(MessageRelevance(
-                            message_id=row[0],
-                            base_relevance=row[1],
-                            current_relevance=row[2],
-                            decay_factor=row[3],
-                            last_updated=datetime.fromisoformat(row[4]),
-                            topic_relevance=json.loads(row[5]) if row[5] else {},
-                            priority=MemoryPriority(row[6]),
-                            access_count=row[7],
-                            last_accessed=datetime.fromisoformat(row[8]) if row[8] else None
-                        ))
-                    except Exception as e:
-                        logger.error(f"Failed to deserialize message relevance: {e}")
-                        continue
-                
-                return relevances
+        await self._save_message_relevances(conversation_id, [relevance])
+    
+    async def _save_message_relevances(self, conversation_id: str, relevances: List[MessageRelevance]) -> None:
+        """Save message relevances to database with one executemany."""
+        rows = [
+            (
+                relevance.message_id,
+                conversation_id,
+                relevance.base_relevance,
+                relevance.current_relevance,
+                relevance.decay_factor,
+                relevance.last_updated.isoformat(),
+                to_json(relevance.topic_relevance),
+                relevance.priority.value,
+                relevance.access_count,
+                relevance.last_accessed.isoformat() if relevance.last_accessed else None,
+                relevance.token_count
+            )
+            for relevance in relevances
+        ]
+        
+        def _db_operation(conn: sqlite3.Connection):
+            conn.executemany("""
+                INSERT OR REPLACE INTO message_relevance (
+                    message_id, conversation_id, base_relevance, current_relevance,
+                    decay_factor, last_updated, topic_relevance, priority,
+                    access_count, last_accessed, token_count
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+        
+        await self._write(conversation_id, "message_relevance", _db_operation)
+    
+    async def _get_message_relevances_for_conversation(
+        self,
+        conversation_id: str,
+        limit: Optional[int] = None,
+        after: Optional[MessageRelevance] = None
+    ) -> List[MessageRelevance]:
+        """Get a conversation's message relevances, most recently updated first.
+        
+        With limit, only that many are returned; pass the last relevance of a
+        page as after to get the next one.
+        """
+        query = """
+            SELECT message_id, base_relevance, current_relevance, decay_factor,
+                   last_updated, topic_relevance, priority, access_count, last_accessed,
+                   token_count
+            FROM message_relevance WHERE conversation_id = ?
+        """
+        params: List[Any] = [conversation_id]
+        if after is not None:
+            # Keyset on (last_updated, message_id): a decay pass stamps many
+            # rows with the same time, so the timestamp alone is not unique
+            last_updated = after.last_updated.isoformat()
+            query += " AND (last_updated < ? OR (last_updated = ? AND message_id > ?))"
+            params += [last_updated, last_updated, after.message_id]
+        query += " ORDER BY last_updated DESC, message_id"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        
+        def _db_operation(conn: sqlite3.Connection):
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            return _materialize(cursor.fetchall(), _row_to_relevance, "message relevance")
+        
+        if limit is None and after is None:
+            return await self._read_rows(conversation_id, "message_relevance", _db_operation)
+        return await self._read(conversation_id, "message_relevance", _db_operation)
+    
+    async def _select_messages_to_prune(
+        self,
+        conversation_id: str,
+        active_message_ids: List[str],
+        tokens_to_remove: int
+    ) -> List[Tuple[str, int]]:
+        """Select the least relevant prunable active messages until their tokens cover the reduction."""
+        if not active_message_ids:
+            return []
+        
+        def _db_operation(conn: sqlite3.Connection):
+            # Only active messages are candidates: archived ones no longer count
+            # towards the window. Messages stored before token counts were
+            # tracked are estimated at 50 tokens; a message is taken while the
+            # tokens before it fall short
+            placeholders = ", ".join("?" * len(active_message_ids))
+            cursor = conn.execute(f"""
+                SELECT message_id, message_tokens FROM (
+                    SELECT message_id, message_tokens,
+                           SUM(message_tokens) OVER (
+                               ORDER BY current_relevance, last_updated DESC
+                               ROWS UNBOUNDED PRECEDING
+                           ) - message_tokens AS tokens_before
+                    FROM (
+                        SELECT message_id, current_relevance, last_updated,
+                               CASE WHEN token_count > 0 THEN token_count ELSE 50 END AS message_tokens
+                        FROM message_relevance
+                        WHERE conversation_id = ? AND priority NOT IN (?, ?)
+                          AND message_id IN ({placeholders})
+                    )
+                )
+                WHERE tokens_before < ?
+                ORDER BY tokens_before
+            """, (
+                conversation_id, MemoryPriority.CRITICAL.value, MemoryPriority.HIGH.value,
+                *active_message_ids, tokens_to_remove
+            ))
+            return cursor.fetchall()
         
-        return await asyncio.get_event_loop().run_in_executor(self._executor, _db_operation)
+        return await self._read(conversation_id, "message_relevance", _db_operation)
+    
+    async def _get_message_token_total(self, conversation_id: str, message_ids: List[str]) -> int:
+        """Sum stored token counts for messages, estimating those without one."""
+        if not message_ids:
+            return 0
+        
+        def _db_operation(conn: sqlite3.Connection):
+            placeholders = ", ".join("?" * len(message_ids))
+            cursor = conn.execute(
+                f"SELECT message_id, token_count FROM message_relevance WHERE message_id IN ({placeholders})",
+                message_ids
+            )
+            return dict(cursor.fetchall())
+        
+        token_counts = await self._read(conversation_id, "message_relevance", _db_operation)
+        # Messages stored before token counts were tracked are estimated at 100 tokens
+        return sum(token_counts.get(message_id) or 100 for message_id in message_ids)
+    
+    async def _get_relevant_message_ids(self, conversation_id: str, min_relevance: float, limit: int) -> List[str]:
+        """Get the ids of a conversation's most relevant messages above a relevance floor."""
+        def _db_operation(conn: sqlite3.Connection):
+            cursor = conn.execute("""
+                SELECT message_id FROM message_relevance
+                WHERE conversation_id = ? AND current_relevance > ?
+                ORDER BY current_relevance DESC, last_updated DESC
+                LIMIT ?
+            """, (conversation_id, min_relevance, limit))
+            return [row[0] for row in cursor.fetchall()]
+        
+        return await self._read(conversation_id, "message_relevance", _db_operation)
     
     async def _save_topic(self, conversation_id: str, topic: ConversationTopic) -> None:
         """Save topic to database."""
-        def _db_operation():
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    INSERT OR REPLACE INTO topics (
-                        id, conversation_id, name, keywords, relevance_score,
-                        confidence_score, first_mention, last_mention, message_count,
-                        embedding, parent_topic_id, subtopic_ids
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    topic.id,
-                    conversation_id,
-                    topic.name,
-                    json.dumps(topic.keywords),
-                    topic.relevance_score,
-                    topic.confidence_score,
-                    topic.first_mention.isoformat(),
-                    topic.last_mention.isoformat(),
-                    topic.message_count,
-                    json.dumps(topic.embedding) if topic.embedding else None,
-                    topic.parent_topic_id,
-                    json.dumps(topic.subtopic_ids)
-                ))
-                conn.commit()
-        
-        await asyncio.get_event_loop().run_in_executor(self._executor, _db_operation)
+        await self._save_topics(conversation_id, [topic])
+    
+    async def _save_topics(self, conversation_id: str, topics: List[ConversationTopic]) -> None:
+        """Save topics to database with one executemany."""
+        rows = [
+            (
+                topic.id,
+                conversation_id,
+                topic.name,
+                to_json(topic.keywords),
+                topic.relevance_score,
+                topic.confidence_score,
+                topic.first_mention.isoformat(),
+                topic.last_mention.isoformat(),
+                topic.message_count,
+                _encode_embedding(topic.embedding),
+                topic.parent_topic_id,
+                to_json(topic.subtopic_ids)
+            )
+            for topic in topics
+        ]
+        
+        def _db_operation(conn: sqlite3.Connection):
+            conn.executemany("""
+                INSERT OR REPLACE INTO topics (
+                    id, conversation_id, name, keywords, relevance_score,
+                    confidence_score, first_mention, last_mention, message_count,
+                    embedding, parent_topic_id, subtopic_ids
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+        
+        await self._write(conversation_id, "topics", _db_operation)
     
     async def _get_topics_for_conversation(self, conversation_id: str) -> List[ConversationTopic]:
         """Get all topics for a conversation."""
-        def _db_operation():
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT id, name, keywords, relevance_score, confidence_score,
-                           first_mention, last_mention, message_count, embedding,
-                           parent_topic_id, subtopic_ids
-                    FROM topics WHERE conversation_id = ?
-                    ORDER BY last_mention DESC
-                """, (conversation_id,))
-                
-                topics = []
-                for row in cursor.fetchall():
-                    try:
-                        topics.append(ConversationTopic(
-                            id=row[0],
-                            name=row[1],
-                            keywords=json.loads(row[2]) if row[2] else [],
-                            relevance_score=row[3],
-                            confidence_score=row[4],
-                            first_mention=datetime.fromisoformat(row[5]),
-                            last_mention=datetime.fromisoformat(row[6]),
-                            message_count=row[7],
-                            embedding=json.loads(row[8]) if row[8] else None,
-                            parent_topic_id=row[9],
-                            subtopic_ids=json.loads(row[10]) if row[10] else []
-                        ))
-                    except Exception as e:
-                        logger.error(f"Failed to deserialize topic: {e}")
-                        continue
-                
-                return topics
+        def _db_operation(conn: sqlite3.Connection):
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT id, name, keywords, relevance_score, confidence_score,
+                       first_mention, last_mention, message_count, embedding,
+                       parent_topic_id, subtopic_ids
+                FROM topics WHERE conversation_id = ?
+                ORDER BY last_mention DESC
+            """, (conversation_id,))
+            return _materialize(cursor.fetchall(), _row_to_topic, "topic")
         
-        return await asyncio.get_event_loop().run_in_executor(self._executor, _db_operation)
+        return await self._read_rows(conversation_id, "topics", _db_operation)
     
     async def _save_topic_transition(self, transition: TopicTransition) -> None:
         """Save topic transition to database."""
-        def _db_operation():
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    INSERT INTO topic_transitions (
-                        id, conversation_id, from_topic_id, to_topic_id,
-                        transition_type, message_id, confidence, similarity_score,
-                        bridging_context, created_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    transition.id,
-                    transition.conversation_id,
-                    transition.from_topic_id,
-                    transition.to_topic_id,
-                    transition.transition_type.value,
-                    transition.message_id,
-                    transition.confidence,
-                    transition.similarity_score,
-                    transition.bridging_context,
-                    transition.created_at.isoformat()
-                ))
-                conn.commit()
-        
-        await asyncio.get_event_loop().run_in_executor(self._executor, _db_operation)
+        row = (
+            transition.id,
+            transition.conversation_id,
+            transition.from_topic_id,
+            transition.to_topic_id,
+            transition.transition_type.value,
+            transition.message_id,
+            transition.confidence,
+            transition.similarity_score,
+            transition.bridging_context,
+            transition.created_at.isoformat()
+        )
+        
+        def _db_operation(conn: sqlite3.Connection):
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT INTO topic_transitions (
+                    id, conversation_id, from_topic_id, to_topic_id,
+                    transition_type, message_id, confidence, similarity_score,
+                    bridging_context, created_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, row)
+        
+        await self._write(transition.conversation_id, "topic_transitions", _db_operation)
     
     async def _save_summary(self, summary: ConversationSummary) -> None:
         """Save summary to database."""
-        def _db_operation():
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    INSERT OR REPLACE INTO summaries (
-                        id, conversation_id, summary_type, content, key_points,
-                        covered_messages, covered_topics, compression_ratio,
-                        token_count, original_token_count, relevance_score, created_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    summary.id,
-                    summary.conversation_id,
-                    summary.summary_type,
-                    summary.content,
-                    json.dumps(summary.key_points),
-                    json.dumps(summary.covered_messages),
-                    json.dumps(summary.covered_topics),
-                    summary.compression_ratio,
-                    summary.token_count,
-                    summary.original_token_count,
-                    summary.relevance_score,
-                    summary.created_at.isoformat()
-                ))
-                conn.commit()
-        
-        await asyncio.get_event_loop().run_in_executor(self._executor, _db_operation)
+        await self._save_summaries(summary.conversation_id, [summary])
+    
+    async def _save_summaries(self, conversation_id: str, summaries: List[ConversationSummary]) -> None:
+        """Save a conversation's summaries to database with one executemany."""
+        rows = [
+            (
+                summary.id,
+                summary.conversation_id,
+                summary.summary_type,
+                summary.content,
+                to_json(summary.key_points),
+                to_json(summary.covered_messages),
+                to_json(summary.covered_topics),
+                summary.compression_ratio,
+                summary.token_count,
+                summary.original_token_count,
+                summary.relevance_score,
+                summary.created_at.isoformat()
+            )
+            for summary in summaries
+        ]
+        
+        def _db_operation(conn: sqlite3.Connection):
+            conn.executemany("""
+                INSERT OR REPLACE INTO summaries (
+                    id, conversation_id, summary_type, content, key_points,
+                    covered_messages, covered_topics, compression_ratio,
+                    token_count, original_token_count, relevance_score, created_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+        
+        await self._write(conversation_id, "summaries", _db_operation)
     
     async def _get_summaries_for_conversation(self, conversation_id: str) -> List[ConversationSummary]:
         """Get all summaries for a conversation."""
-        def _db_operation():
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT id, summary_type, content, key_points, covered_messages,
-                           covered_topics, compression_ratio, token_count,
-                           original_token_count, relevance_score, created_at
-                    FROM summaries WHERE conversation_id = ?
-                    ORDER BY created_at DESC
-                """, (conversation_id,))
-                
-                summaries = []
-                for row in cursor.fetchall():
-                    try:
-                        summaries.append(ConversationSummary(
-                            id=row[0],
-                            conversation_id=conversation_id,
-                            summary_type=row[1],
-                            content=row[2],
-                            key_points=json.loads(row[3]) if row[3] else [],
-                            covered_messages=json.loads(row[4]) if row[4] else [],
-                            covered_topics=json.loads(row[5]) if row[5] else [],
-                            compression_ratio=row[6],
-                            token_count=row[7],
-                            original_token_count=row[8],
-                            relevance_score=row[9],
-                            created_at=datetime.fromisoformat(row[10])
-                        ))
-                    except Exception as e:
-                        logger.error(f"Failed to deserialize summary: {e}")
-                        continue
-                
-                return summaries
+        def _db_operation(conn: sqlite3.Connection):
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT id, conversation_id, summary_type, content, key_points,
+                       covered_messages, covered_topics, compression_ratio, token_count,
+                       original_token_count, relevance_score, created_at
+                FROM summaries WHERE conversation_id = ?
+                ORDER BY created_at DESC
+            """, (conversation_id,))
+            return _materialize(cursor.fetchall(), _row_to_summary, "summary")
         
-        return await asyncio.get_event_loop().run_in_executor(self._executor, _db_operation)
+        return await self._read_rows(conversation_id, "summaries", _db_operation)
     
     async def _save_memory_metrics(self, metrics: MemoryMetrics) -> None:
         """Save memory metrics to database."""
-        def _db_operation():
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    INSERT OR REPLACE INTO memory_metrics (
-                        conversation_id, total_messages, active_messages,
-                        archived_messages, total_summaries, compression_ratio,
-                        avg_relevance_score, topics_identified, topic_transitions,
-                        memory_efficiency, processing_time_ms, last_updated
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    metrics.conversation_id,
-                    metrics.total_messages,
-                    metrics.active_messages,
-                    metrics.archived_messages,
-                    metrics.total_summaries,
-                    metrics.compression_ratio,
-                    metrics.avg_relevance_score,
-                    metrics.topics_identified,
-                    metrics.topic_transitions,
-                    metrics.memory_efficiency,
-                    metrics.processing_time_ms,
-                    metrics.last_updated.isoformat()
-                ))
-                conn.commit()
-        
-        await asyncio.get_event_loop().run_in_executor(self._executor, _db_operation)
+        row = (
+            metrics.conversation_id,
+            metrics.total_messages,
+            metrics.active_messages,
+            metrics.archived_messages,
+            metrics.total_summaries,
+            metrics.compression_ratio,
+            metrics.avg_relevance_score,
+            metrics.topics_identified,
+            metrics.topic_transitions,
+            metrics.memory_efficiency,
+            metrics.processing_time_ms,
+            metrics.last_updated.isoformat()
+        )
+        
+        def _db_operation(conn: sqlite3.Connection):
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT OR REPLACE INTO memory_metrics (
+                    conversation_id, total_messages, active_messages,
+                    archived_messages, total_summaries, compression_ratio,
+                    avg_relevance_score, topics_identified, topic_transitions,
+                    memory_efficiency, processing_time_ms, last_updated
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, row)
+        
+        await self._write(metrics.conversation_id, "memory_metrics", _db_operation)
     
     async def _update_memory_metrics(self, conversation_id: str, processing_time: float) -> None:
         """Update memory metrics."""
-        def _db_operation():
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                # Get current metrics
-                cursor.execute("""
-                    SELECT total_messages, processing_time_ms
-                    FROM memory_metrics WHERE conversation_id = ?
-                """, (conversation_id,))
-                
-                row = cursor.fetchone()
-                if row:
-                    total_messages = row[0] + 1
-                    avg_processing_time = (row[1] + processing_time) / 2
-                else:
-                    total_messages = 1
-                    avg_processing_time = processing_time
-                
-                # Update metrics
-                cursor.execute("""
-                    UPDATE memory_metrics SET 
-                        total_messages = ?,
-                        processing_time_ms = ?,
-                        last_updated = ?
-                    WHERE conversation_id = ?
-                """, (
-                    total_messages,
-                    avg_processing_time,
-                    datetime.now(timezone.utc).isoformat(),
-                    conversation_id
-                ))
-                
-                if cursor.rowcount == 0:
-                    # Insert new metrics if not exists
-                    cursor.execute("""
-                        INSERT INTO memory_metrics (
-                            conversation_id, total_messages, processing_time_ms, last_updated
-                        ) VALUES (?, ?, ?, ?)
-                    """, (
-                        conversation_id,
-                        total_messages,
-                        avg_processing_time,
-                        datetime.now(timezone.utc).isoformat()
-                    ))
-                
-                conn.commit()
+        def _db_operation(conn: sqlite3.Connection):
+            # Count the message and fold its processing time into the running average
+            conn.execute("""
+                INSERT INTO memory_metrics (
+                    conversation_id, total_messages, processing_time_ms, last_updated
+                ) VALUES (?, 1, ?, ?)
+                ON CONFLICT(conversation_id) DO UPDATE SET
+                    total_messages = total_messages + 1,
+                    processing_time_ms = (processing_time_ms + excluded.processing_time_ms) / 2,
+                    last_updated = excluded.last_updated
+            """, (
+                conversation_id,
+                processing_time,
+                datetime.now(timezone.utc).isoformat()
+            ))
         
-        await asyncio.get_event_loop().run_in_executor(self._executor, _db_operation)
+        await self._write(conversation_id, "memory_metrics", _db_operation)
 
-# Global instance
+# Global instance; creation is locked so concurrent first calls from worker
+# threads cannot open two sets of database connections
 _conversation_memory_manager = None
+_conversation_memory_manager_lock = Lock()
 
 def get_conversation_memory_manager(
     storage_path: Optional[str] = None,
@@ -996,5 +1635,7 @@ def get_conversation_memory_manager(
     """Get or create the global conversation memory manager."""
     global _conversation_memory_manager
     if _conversation_memory_manager is None:
-        _conversation_memory_manager = ConversationMemoryManager(storage_path, config)
+        with _conversation_memory_manager_lock:
+            if _conversation_memory_manager is None:
+                _conversation_memory_manager = ConversationMemoryManager(storage_path, config)
     return _conversation_memory_manager
@@ -143,7 +143,7 @@ class TagRelevantBatchProcessor:
             logger.error(f"Batch processing [{batch_id}] failed: {str(e)}")
             
             # Handle batch-level failure
-            failure_report = await self.error_handler.handle_failure(
+            failure_report = self.error_handler.handle_failure(
                 error=BatchProcessingError(
                     message=f"Batch processing failed: {str(e)}",
                     failed_files=available_files,
@@ -292,17 +292,14 @@ class TagRelevantBatchProcessor:
         """Validate that files can be accessed and processed."""
         valid_files = []
         
-        validation_tasks = [
-            self.tool_factory.validate_file_access(file_path)
-            for file_path in file_paths
-        ]
-        
-        results = await asyncio.gather(*validation_tasks, return_exceptions=True)
+        try:
+            results = await self.tool_factory.validate_files_batch(file_paths)
+        except Exception as e:
+            logger.error(f"File validation failed for batch: {str(e)}")
+            return valid_files
         
-        for file_path, result in zip(file_paths, results):
-            if isinstance(result, Exception):
-                logger.error(f"File validation failed for {file_path}: {str(result)}")
-            elif result:
+        for file_path in file_paths:
+            if results.get(file_path):
                 valid_files.append(file_path)
             else:
                 logger.warning(f"File validation failed for {file_path}")
@@ -379,7 +376,7 @@ class TagRelevantBatchProcessor:
                     errors.append(error_info)
                     
                     # Handle the error through error handler
-                    await self.error_handler.handle_failure(
+                    self.error_handler.handle_failure(
                         error=result,
                         file_path=file_path,
                         context={"batch_id": batch_id, "target_tags": target_tags}
@@ -550,7 +547,7 @@ class TagRelevantBatchProcessor:
             logger.error(f"Tag-based batch processing [{batch_id}] failed: {str(e)}")
             
             # Handle batch-level failure
-            failure_report = await self.error_handler.handle_failure(
+            failure_report = self.error_handler.handle_failure(
                 error=BatchProcessingError(
                     message=f"Tag-based batch processing failed: {str(e)}",
                     failed_files=selected_docs if 'selected_docs' in locals() else [],
@@ -4,6 +4,7 @@ import asyncio
 from typing import List, Dict, Optional, Any, Tuple
 from dataclasses import dataclass, field
 from pathlib import Path
+from threading import Lock
 import psutil
 import time
 
@@ -502,12 +503,21 @@ class ChunkOptimizer:
             }
         }
 
-# Global optimizer instance
+# Global optimizer instance, created once under a lock
 _chunk_optimizer: Optional[ChunkOptimizer] = None
+_chunk_optimizer_lock = Lock()
 
 def get_chunk_optimizer(config: Optional[ChunkOptimizationConfig] = None) -> ChunkOptimizer:
     """Get or create the global chunk optimizer instance."""
     global _chunk_optimizer
     if _chunk_optimizer is None:
-        _chunk_optimizer = ChunkOptimizer(config)
+        with _chunk_optimizer_lock:
+            if _chunk_optimizer is None:
+                _chunk_optimizer = ChunkOptimizer(config)
     return _chunk_optimizer
+
+def reset_chunk_optimizer() -> None:
+    """Reset the global chunk optimizer instance (useful for testing)."""
+    global _chunk_optimizer
+    with _chunk_optimizer_lock:
+        _chunk_optimizer = None
@@ -4,6 +4,7 @@ import logging
 from typing import Dict, List, Optional, Any, Tuple, Union
 from dataclasses import dataclass, field
 from pathlib import Path
+from threading import Lock
 from abc import ABC, abstractmethod
 import mimetypes
 
@@ -509,12 +510,21 @@ class ContentExtractor:
         logger.info(f"Batch extracted content from {len(results)} files")
         return results
 
-# Global extractor instance
+# Global extractor instance, created once under a lock
 _content_extractor: Optional[ContentExtractor] = None
+_content_extractor_lock = Lock()
 
 def get_content_extractor() -> ContentExtractor:
     """Get or create the global content extractor instance."""
     global _content_extractor
     if _content_extractor is None:
-        _content_extractor = ContentExtractor()
+        with _content_extractor_lock:
+            if _content_extractor is None:
+                _content_extractor = ContentExtractor()
     return _content_extractor
+
+def reset_content_extractor() -> None:
+    """Reset the global content extractor instance (useful for testing)."""
+    global _content_extractor
+    with _content_extractor_lock:
+        _content_extractor = None
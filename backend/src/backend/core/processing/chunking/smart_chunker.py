@@ -5,6 +5,7 @@ from typing import List, Dict, Optional, Tuple, Any
 from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
+from threading import Lock
 import tiktoken
 
 logger = logging.getLogger(__name__)
@@ -603,12 +604,21 @@ class SmartChunker:
             "total_overlap_chars": sum(chunk.overlap_with_previous for chunk in chunks)
         }
 
-# Global chunker instance
+# Global chunker instance, created once under a lock
 _smart_chunker: Optional[SmartChunker] = None
+_smart_chunker_lock = Lock()
 
 def get_smart_chunker() -> SmartChunker:
     """Get or create the global smart chunker instance."""
     global _smart_chunker
     if _smart_chunker is None:
-        _smart_chunker = SmartChunker()
+        with _smart_chunker_lock:
+            if _smart_chunker is None:
+                _smart_chunker = SmartChunker()
     return _smart_chunker
+
+def reset_smart_chunker() -> None:
+    """Reset the global smart chunker instance (useful for testing)."""
+    global _smart_chunker
+    with _smart_chunker_lock:
+        _smart_chunker = None
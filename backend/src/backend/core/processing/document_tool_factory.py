@@ -2,12 +2,14 @@
 
 import os
 import asyncio
+import importlib
 import logging
-from typing import Dict, List, Optional, Type, Set, Any, Union
+from collections import defaultdict
+from functools import cache, lru_cache
+from typing import Dict, List, NamedTuple, Optional, Type, Set, Any, Tuple, Union
 from pathlib import Path
 from abc import ABC, abstractmethod
 
-from crewai_tools import TXTSearchTool, PDFSearchTool, DOCXSearchTool, FileReadTool
 from crewai.tools import BaseTool
 from pydantic import BaseModel
 
@@ -16,18 +18,60 @@ from ..config import get_settings
 
 logger = logging.getLogger(__name__)
 
+# Tools may be referenced as "module:ClassName" so crewai_tools (and the
+# embedding stack it pulls in) is only imported once a tool is needed
+ToolReference = Union[Type[BaseTool], str]
+
+TXT_SEARCH_TOOL = "crewai_tools:TXTSearchTool"
+PDF_SEARCH_TOOL = "crewai_tools:PDFSearchTool"
+DOCX_SEARCH_TOOL = "crewai_tools:DOCXSearchTool"
+FILE_READ_TOOL = "crewai_tools:FileReadTool"
+
+_RAG_TOOLS = (TXT_SEARCH_TOOL, PDF_SEARCH_TOOL, DOCX_SEARCH_TOOL)
+
+
+@lru_cache(maxsize=None)
+def _import_tool_class(path: str) -> Type[BaseTool]:
+    """Import a tool class from a "module:ClassName" reference."""
+    module_name, _, class_name = path.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def _resolve_tool_class(tool: ToolReference) -> Type[BaseTool]:
+    """Resolve a tool reference to its class, importing it on first use."""
+    return _import_tool_class(tool) if isinstance(tool, str) else tool
+
+
+def _tool_name(tool: ToolReference) -> str:
+    """Get a tool's class name without importing it."""
+    return tool.rpartition(":")[2] if isinstance(tool, str) else tool.__name__
+
+
+def _is_rag_tool(tool_class: Type[BaseTool]) -> bool:
+    """Check whether a tool class is one of the RAG search tools."""
+    return issubclass(tool_class, tuple(_resolve_tool_class(t) for t in _RAG_TOOLS))
+
 
 class ToolConfiguration(BaseModel):
     """Configuration for a specific tool type."""
 
-    tool_class: Type[BaseTool]
+    tool_class: ToolReference
     extensions: List[str]
-    fallback_tools: List[Type[BaseTool]]
+    fallback_tools: List[ToolReference]
     priority: int = 1
     concurrent_limit: int = 5
     config: Optional[Dict[str, Any]] = None
 
 
+class _ToolEntry(NamedTuple):
+    """Flattened registry entry read on the per-file dispatch path."""
+
+    tool_class: ToolReference
+    fallback_tools: Tuple[ToolReference, ...]
+    concurrent_limit: int
+    config: Optional[Dict[str, Any]]
+
+
 class DocumentToolFactory:
     """Factory for creating appropriate RAG tools based on file extensions."""
 
@@ -36,6 +80,9 @@ class DocumentToolFactory:
         self.settings = get_settings()
         self.unified_config = unified_config or self._get_default_config()
         self._tool_registry: Dict[str, ToolConfiguration] = {}
+        # Mirrors _tool_registry as plain tuples; the Pydantic models are
+        # kept for registration and introspection only
+        self._fast_table: Dict[str, _ToolEntry] = {}
         self._tool_instances: Dict[str, BaseTool] = {}
         self._initialize_registry()
 
@@ -53,9 +100,9 @@ class DocumentToolFactory:
         # Register TXTSearchTool for text and markdown files - optimized for RAG operations
         self.register_tool_type(
             ToolConfiguration(
-                tool_class=TXTSearchTool,  # Use TXTSearchTool for RAG operations
+                tool_class=TXT_SEARCH_TOOL,  # Use TXTSearchTool for RAG operations
                 extensions=[".txt", ".md"],
-                fallback_tools=[FileReadTool],
+                fallback_tools=[FILE_READ_TOOL],
                 priority=1,
                 concurrent_limit=5,
                 config=self.unified_config,
@@ -65,9 +112,9 @@ class DocumentToolFactory:
         # Register PDFSearchTool for PDF files first, then fallback to other tools
         self.register_tool_type(
             ToolConfiguration(
-                tool_class=PDFSearchTool,  # Use PDFSearchTool for RAG operations
+                tool_class=PDF_SEARCH_TOOL,  # Use PDFSearchTool for RAG operations
                 extensions=[".pdf"],
-                fallback_tools=[FileReadTool, TXTSearchTool],
+                fallback_tools=[FILE_READ_TOOL, TXT_SEARCH_TOOL],
                 priority=1,
                 concurrent_limit=3,  # Lower limit for PDF processing
                 config=self.unified_config,
@@ -77,9 +124,9 @@ class DocumentToolFactory:
         # Register DOCXSearchTool for Word documents
         self.register_tool_type(
             ToolConfiguration(
-                tool_class=DOCXSearchTool,  # Use DOCXSearchTool for RAG operations
+                tool_class=DOCX_SEARCH_TOOL,  # Use DOCXSearchTool for RAG operations
                 extensions=[".docx"],
-                fallback_tools=[FileReadTool, TXTSearchTool],
+                fallback_tools=[FILE_READ_TOOL, TXT_SEARCH_TOOL],
                 priority=1,
                 concurrent_limit=3,  # Lower limit for DOCX processing
                 config=self.unified_config,
@@ -92,11 +139,18 @@ class DocumentToolFactory:
             ext_lower = ext.lower()
             if ext_lower in self._tool_registry:
                 logger.warning(
-                    f"Overriding existing tool registration for extension: {ext_lower}"
+                    "Overriding existing tool registration for extension: %s", ext_lower
                 )
             self._tool_registry[ext_lower] = config
+            self._fast_table[ext_lower] = _ToolEntry(
+                config.tool_class,
+                tuple(config.fallback_tools),
+                config.concurrent_limit,
+                config.config,
+            )
             logger.info(
-                f"Registered {config.tool_class.__name__} for extension: {ext_lower}"
+                "Registered %s for extension: %s",
+                _tool_name(config.tool_class), ext_lower
             )
 
     def get_supported_extensions(self) -> Set[str]:
@@ -105,17 +159,17 @@ class DocumentToolFactory:
 
     def get_tool_for_extension(self, extension: str) -> Optional[Type[BaseTool]]:
         """Get the primary tool class for a given extension."""
-        config = self._tool_registry.get(extension.lower())
-        return config.tool_class if config else None
+        entry = self._fast_table.get(extension.lower())
+        return _resolve_tool_class(entry.tool_class) if entry else None
 
     def get_fallback_tools(self, extension: str) -> List[Type[BaseTool]]:
         """Get fallback tools for a given extension."""
-        config = self._tool_registry.get(extension.lower())
-        return config.fallback_tools if config else []
+        entry = self._fast_table.get(extension.lower())
+        return [_resolve_tool_class(t) for t in entry.fallback_tools] if entry else []
 
     def has_support_for(self, extension: str) -> bool:
         """Check if the factory supports a given file extension."""
-        return extension.lower() in self._tool_registry
+        return extension.lower() in self._fast_table
 
     def create_tool(
         self, file_path: str, config_override: Optional[Dict[str, Any]] = None
@@ -126,69 +180,76 @@ class DocumentToolFactory:
         if path.is_absolute():
             # Path is already resolved, use as-is
             resolved_path = path
-            logger.debug(f"Using pre-resolved absolute path: {resolved_path}")
+            logger.debug("Using pre-resolved absolute path: %s", resolved_path)
         else:
             # Path needs resolution (legacy behavior)
             resolved_path = self._resolve_file_path(file_path)
-            logger.debug(f"Resolved relative path: {file_path} -> {resolved_path}")
+            logger.debug("Resolved relative path: %s -> %s", file_path, resolved_path)
 
         file_ext = resolved_path.suffix.lower()
 
-        if not self.has_support_for(file_ext):
+        entry = self._fast_table.get(file_ext)
+        if entry is None:
             raise ValueError(f"Unsupported file extension: {file_ext}")
 
-        tool_config = self._tool_registry[file_ext]
-        tool_class = tool_config.tool_class
+        tool_ref, fallback_tools, _, tool_config = entry
+        tool_class = _resolve_tool_class(tool_ref)
 
         # Use override config if provided, otherwise use unified config
-        final_config = config_override or tool_config.config
+        final_config = config_override or tool_config
 
         try:
             # Ensure we always have a configuration for RAG tools
-            final_config = config_override or tool_config.config or self._get_default_config()
+            final_config = config_override or tool_config or self._get_default_config()
 
             # Create tool instance with the resolved path, ensuring proper configuration for RAG tools
-            if issubclass(tool_class, (TXTSearchTool, PDFSearchTool, DOCXSearchTool)):
+            if _is_rag_tool(tool_class):
                 # Always pass config to RAG tools
                 tool = tool_class(file_path=str(resolved_path), config=final_config)
                 logger.info(
-                    f"Created RAG-enabled tool {tool_class.__name__} for {resolved_path} (original: {file_path}) with config: {final_config}"
+                    "Created RAG-enabled tool %s for %s (original: %s) with config: %s",
+                    tool_class.__name__, resolved_path, file_path, final_config
                 )
             else:
                 # For non-RAG tools like FileReadTool, config might not be needed
                 tool = tool_class(file_path=str(resolved_path))
                 logger.warning(
-                    f"Created non-RAG tool {tool_class.__name__} for {resolved_path} - document references may not work optimally"
+                    "Created non-RAG tool %s for %s - document references may not work optimally",
+                    tool_class.__name__, resolved_path
                 )
             
             return tool
 
         except Exception as e:
             logger.error(
-                f"Failed to create {tool_class.__name__} for {resolved_path}: {str(e)}"
+                "Failed to create %s for %s: %s", tool_class.__name__, resolved_path, e
             )
             # Try fallback tools
-            for fallback_class in tool_config.fallback_tools:
+            for fallback in fallback_tools:
                 try:
+                    fallback_class = _resolve_tool_class(fallback)
                     # Use consistent configuration approach for fallback tools
-                    if issubclass(fallback_class, (TXTSearchTool, PDFSearchTool, DOCXSearchTool)):
+                    if _is_rag_tool(fallback_class):
                         # Always pass config to RAG fallback tools
                         fallback_tool = fallback_class(
                             file_path=str(resolved_path), config=final_config
                         )
                         logger.warning(
-                            f"Using RAG-enabled fallback tool {fallback_class.__name__} for {resolved_path} with config: {final_config}"
+                            "Using RAG-enabled fallback tool %s for %s with config: %s",
+                            fallback_class.__name__, resolved_path, final_config
                         )
                     else:
                         # For non-RAG tools like FileReadTool
                         fallback_tool = fallback_class(file_path=str(resolved_path))
                         logger.warning(
-                            f"Using non-RAG fallback tool {fallback_class.__name__} for {resolved_path} - document references may not work optimally"
+                            "Using non-RAG fallback tool %s for %s - document references may not work optimally",
+                            fallback_class.__name__, resolved_path
                         )
                     return fallback_tool
                 except Exception as fallback_error:
                     logger.error(
-                        f"Fallback {fallback_class.__name__} also failed: {str(fallback_error)}"
+                        "Fallback %s also failed: %s",
+                        _tool_name(fallback), fallback_error
                     )
                     continue
 
@@ -206,22 +267,35 @@ class DocumentToolFactory:
 
     def get_concurrent_limit(self, extension: str) -> int:
         """Get the concurrent processing limit for a given file extension."""
-        config = self._tool_registry.get(extension.lower())
-        return config.concurrent_limit if config else 1
+        entry = self._fast_table.get(extension.lower())
+        return entry.concurrent_limit if entry else 1
 
     def get_tool_info(self) -> Dict[str, Dict[str, Any]]:
         """Get information about all registered tools."""
         info = {}
         for ext, config in self._tool_registry.items():
             info[ext] = {
-                "tool_class": config.tool_class.__name__,
-                "fallback_tools": [tool.__name__ for tool in config.fallback_tools],
+                "tool_class": _tool_name(config.tool_class),
+                "fallback_tools": [_tool_name(tool) for tool in config.fallback_tools],
                 "priority": config.priority,
                 "concurrent_limit": config.concurrent_limit,
                 "has_config": config.config is not None,
             }
         return info
 
+    def _upload_search_dirs(self) -> List[Path]:
+        """Directories a relative document path is looked up in, in priority order."""
+        # Prioritize frontend structure (same as chat service)
+        return [
+            # Frontend context paths (most likely for document analysis)
+            Path().cwd() / "frontend" / "uploads",
+            Path("./frontend/uploads"),
+            Path("../frontend/uploads"),
+            
+            # Backend context paths (fallback)
+            Path(self.settings.upload_base_dir),
+        ]
+
     def _resolve_file_path(self, file_path: str) -> Path:
         """Resolve file path to the correct location using enhanced path resolution."""
         path = Path(file_path)
@@ -234,103 +308,148 @@ class DocumentToolFactory:
         if '..' in str(path):
             raise ValueError("Directory traversal is not allowed")
 
-        logger.debug(f"Tool factory resolving document path: {file_path}")
+        logger.debug("Tool factory resolving document path: %s", file_path)
         
-        # Try multiple possible path combinations - prioritize frontend structure (same as chat service)
-        possible_paths = [
-            # Frontend context paths (most likely for document analysis)
-            Path().cwd() / "frontend" / "uploads" / file_path,
-            Path("./frontend/uploads") / file_path,
-            Path("../frontend/uploads") / file_path,
-            
-            # Backend context paths (fallback)
-            Path(self.settings.upload_base_dir) / file_path,
-        ]
+        # Try multiple possible path combinations
+        possible_paths = [directory / file_path for directory in self._upload_search_dirs()]
         
         # Find the first valid path with detailed logging
         for i, full_path in enumerate(possible_paths):
             try:
                 absolute_path = full_path.resolve()
-                logger.debug(f"Tool factory trying path {i+1}/{len(possible_paths)}: {absolute_path}")
+                logger.debug("Tool factory trying path %s/%s: %s", i+1, len(possible_paths), absolute_path)
                 
                 if absolute_path.exists() and absolute_path.is_file():
-                    logger.info(f"✓ Tool factory found document at: {absolute_path}")
+                    logger.info("✓ Tool factory found document at: %s", absolute_path)
                     return absolute_path
                 else:
-                    logger.debug(f"  Path exists: {absolute_path.exists()}, Is file: {absolute_path.is_file() if absolute_path.exists() else 'N/A'}")
+                    logger.debug("  Path exists: %s, Is file: %s", absolute_path.exists(), absolute_path.is_file() if absolute_path.exists() else 'N/A')
                     
             except Exception as e:
-                logger.debug(f"  Path resolution failed: {e}")
+                logger.debug("  Path resolution failed: %s", e)
                 continue
         
         # If no path found, log detailed debugging information
-        logger.error(f"✗ Tool factory document not found: {file_path}")
+        logger.error("✗ Tool factory document not found: %s", file_path)
         
         # Create more helpful error message
         attempted_paths = [str(p.resolve()) for p in possible_paths]
-        logger.error(f"Tool factory attempted paths: {attempted_paths}")
+        logger.error("Tool factory attempted paths: %s", attempted_paths)
         
         raise FileNotFoundError(f"Document not found: {file_path}. Tried {len(possible_paths)} possible locations.")
 
     async def validate_file_access(self, file_path: str) -> bool:
         """Validate that a file can be accessed and processed."""
+        return await asyncio.to_thread(self._validate_file_sync, file_path)
+
+    def _validate_file_sync(self, file_path: str) -> bool:
+        """Blocking implementation of validate_file_access."""
         try:
-            # Resolve to the correct path using settings configuration
+            # Resolve to the correct path using settings configuration; this
+            # only returns existing regular files
             full_path = self._resolve_file_path(file_path)
+        except Exception as e:
+            logger.error("Error validating file access for %s: %s", file_path, e)
+            return False
 
-            # Check if file exists
-            if not full_path.exists():
-                logger.error(
-                    f"File does not exist: {full_path} (original: {file_path})"
-                )
-                return False
+        # Absolute paths are returned as given, without a lookup
+        if not full_path.is_file():
+            logger.error("File does not exist or is not a file: %s (original: %s)", full_path, file_path)
+            return False
+        return self._validate_resolved(full_path)
 
-            # Check if it's actually a file
-            if not full_path.is_file():
-                logger.error(f"Path is not a file: {full_path}")
-                return False
+    async def validate_files_batch(self, file_paths: List[str]) -> Dict[str, bool]:
+        """Validate many files off the event loop, listing each directory once.
 
-            # Check file extension support
-            if not self.has_support_for(full_path.suffix):
-                logger.error(f"Unsupported file type: {full_path.suffix}")
-                return False
+        Returns:
+            Dictionary mapping each given path to whether it can be processed
+        """
+        return await asyncio.to_thread(self._validate_files_sync, file_paths)
 
-            # Check file permissions
-            if not os.access(full_path, os.R_OK):
-                logger.error(f"No read permission for file: {full_path}")
-                return False
+    def _validate_files_sync(self, file_paths: List[str]) -> Dict[str, bool]:
+        """Blocking implementation of validate_files_batch.
 
-            logger.info(f"File validation successful: {full_path}")
-            return True
+        Instead of stat-ing every candidate location of every file, each
+        candidate directory is listed once and the files are looked up in the
+        listings; DirEntry caches its type, so is_file() needs no extra call.
+        """
+        results: Dict[str, bool] = {}
+        search_dirs = self._upload_search_dirs()
+        listings: Dict[Path, Dict[str, os.DirEntry]] = {}
 
-        except Exception as e:
-            logger.error(f"Error validating file access for {file_path}: {str(e)}")
+        for file_path in file_paths:
+            path = Path(file_path)
+            if path.is_absolute():
+                candidates = [path]
+            elif '..' in str(path):
+                logger.error("Error validating file access for %s: Directory traversal is not allowed", file_path)
+                results[file_path] = False
+                continue
+            else:
+                candidates = [directory / path for directory in search_dirs]
+
+            found: Optional[Path] = None
+            for candidate in candidates:
+                listing = listings.get(candidate.parent)
+                if listing is None:
+                    listing = listings[candidate.parent] = self._list_directory(candidate.parent)
+                entry = listing.get(candidate.name)
+                if entry is not None and entry.is_file():
+                    found = Path(entry.path)
+                    break
+
+            if found is None:
+                logger.error("Document not found: %s. Tried %s possible locations.", file_path, len(candidates))
+                results[file_path] = False
+                continue
+            results[file_path] = self._validate_resolved(found)
+
+        return results
+
+    @staticmethod
+    def _list_directory(directory: Path) -> Dict[str, os.DirEntry]:
+        """List a directory's entries by name; a missing directory lists as empty."""
+        try:
+            with os.scandir(directory) as entries:
+                return {entry.name: entry for entry in entries}
+        except (FileNotFoundError, NotADirectoryError):
+            return {}
+        except OSError as e:
+            logger.error("Cannot scan directory %s: %s", directory, e)
+            return {}
+
+    def _validate_resolved(self, full_path: Path) -> bool:
+        """Validate an existing regular file can be processed."""
+        # Check file extension support
+        if not self.has_support_for(full_path.suffix):
+            logger.error("Unsupported file type: %s", full_path.suffix)
             return False
 
+        # Check file permissions
+        if not os.access(full_path, os.R_OK):
+            logger.error("No read permission for file: %s", full_path)
+            return False
+
+        logger.info("File validation successful: %s", full_path)
+        return True
+
     def get_processing_strategy(self, file_paths: List[str]) -> Dict[str, List[str]]:
         """Group files by extension for optimized batch processing."""
-        strategy = {}
+        strategy: Dict[str, List[str]] = defaultdict(list)
 
         for file_path in file_paths:
-            ext = Path(file_path).suffix.lower()
-            if ext not in strategy:
-                strategy[ext] = []
-            strategy[ext].append(file_path)
+            strategy[Path(file_path).suffix.lower()].append(file_path)
+
+        # Resolve each extension's priority once (lower number = higher priority);
+        # unregistered extensions sort last
+        registry = self._tool_registry
+        priorities = {
+            ext: registry[ext].priority if ext in registry else 999
+            for ext in strategy
+        }
 
-        # Sort by priority (lower number = higher priority)
         sorted_strategy = {}
-        for ext in sorted(
-            strategy.keys(),
-            key=lambda x: self._tool_registry.get(
-                x,
-                ToolConfiguration(
-                    tool_class=FileReadTool,
-                    extensions=[],
-                    fallback_tools=[],
-                    priority=999,
-                ),
-            ).priority,
-        ):
+        for ext in sorted(strategy, key=priorities.__getitem__):
             sorted_strategy[ext] = strategy[ext]
 
         return sorted_strategy
@@ -356,7 +475,8 @@ class DocumentToolFactory:
 
         if len(selected_documents) > max_documents:
             logger.warning(
-                f"Document limit enforced: processing {max_documents} of {len(selected_documents)} documents"
+                "Document limit enforced: processing %s of %s documents",
+                max_documents, len(selected_documents)
             )
 
         # Group documents by extension for efficient tool creation
@@ -367,7 +487,7 @@ class DocumentToolFactory:
 
             if not self.has_support_for(file_ext):
                 logger.warning(
-                    f"Skipping unsupported file type: {file_ext} for {doc_path}"
+                    "Skipping unsupported file type: %s for %s", file_ext, doc_path
                 )
                 continue
 
@@ -379,30 +499,24 @@ class DocumentToolFactory:
                 tool_batches[file_ext].append(tool)
 
             except Exception as e:
-                logger.error(f"Failed to create tool for {doc_path}: {str(e)}")
+                logger.error("Failed to create tool for %s: %s", doc_path, e)
                 continue
 
         total_tools = sum(len(tools) for tools in tool_batches.values())
         logger.info(
-            f"Created analysis batch: {total_tools} tools across {len(tool_batches)} file types"
+            "Created analysis batch: %s tools across %s file types",
+            total_tools, len(tool_batches)
         )
 
         return tool_batches
 
 
-# Global factory instance
-_document_tool_factory: Optional[DocumentToolFactory] = None
-
-
+@cache
 def get_document_tool_factory() -> DocumentToolFactory:
     """Get or create the global document tool factory instance."""
-    global _document_tool_factory
-    if _document_tool_factory is None:
-        _document_tool_factory = DocumentToolFactory()
-    return _document_tool_factory
+    return DocumentToolFactory()
 
 
 def reset_factory() -> None:
     """Reset the global factory instance (useful for testing)."""
-    global _document_tool_factory
-    _document_tool_factory = None
+    get_document_tool_factory.cache_clear()
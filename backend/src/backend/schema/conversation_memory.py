@@ -70,6 +70,7 @@ class MessageRelevance(BaseModel):
     priority: MemoryPriority = Field(MemoryPriority.MEDIUM, description="Memory retention priority")
     access_count: int = Field(0, description="Number of times accessed", ge=0)
     last_accessed: Optional[datetime] = Field(None, description="Last access timestamp")
+    token_count: int = Field(0, description="Tokens in the message content", ge=0)
     
 class ConversationSummary(BaseModel):
     """Model for conversation summaries at different granularities."""
@@ -1,5 +1,5 @@
 """Pydantic models for document analysis functionality."""
-from typing import Optional, List
+from typing import Any, Dict, Optional, List, Union
 from pydantic import BaseModel, Field, validator
 import uuid
 from datetime import datetime
@@ -76,7 +76,7 @@ class AnalyzeDocumentErrorResponse(BaseResponse):
     request_id: str = Field(..., description="Unique identifier for this analysis request")
     error: str = Field(..., description="Error type")
     message: str = Field(..., description="Human-readable error message")
-    details: Optional[str] = Field(None, description="Additional error details for debugging")
+    details: Optional[Union[str, Dict[str, Any]]] = Field(None, description="Additional error details for debugging")
     created_at: datetime = Field(default_factory=datetime.utcnow, description="Timestamp when error occurred")
 
 
@@ -0,0 +1,73 @@
+"""Tests for circuit breaker success bookkeeping and state snapshots."""
+import pytest
+
+from backend.core.error_handling.circuit_breaker import (
+    CircuitBreaker, CircuitBreakerConfig, CircuitState
+)
+
+class TestCircuitBreaker:
+    """Test suite for CircuitBreaker."""
+
+    @pytest.fixture
+    def breaker(self):
+        """Create a breaker that opens after three failures."""
+        return CircuitBreaker("test", CircuitBreakerConfig(failure_threshold=3, success_threshold=2))
+
+    def test_closed_success_skips_lock(self, breaker):
+        """Test a success on a CLOSED breaker never takes the lock."""
+        class FailingLock:
+            def __enter__(self):
+                raise AssertionError("lock taken on the CLOSED success path")
+
+            def __exit__(self, *exc_info):
+                return False
+
+        breaker._lock = FailingLock()
+        breaker._on_success()
+        assert breaker.state == CircuitState.CLOSED
+        assert breaker.last_success_time is not None
+
+    def test_closed_success_decrements_failures(self, breaker):
+        """Test each CLOSED success forgives one recorded failure."""
+        breaker._on_failure(RuntimeError("first"))
+        breaker._on_failure(RuntimeError("second"))
+        assert breaker.failure_count == 2
+
+        breaker._on_success()
+        assert breaker.failure_count == 1
+        assert breaker.get_state()["failure_count"] == 1
+
+    def test_half_open_successes_close_breaker(self, breaker):
+        """Test enough HALF_OPEN successes close the breaker."""
+        breaker.state = CircuitState.HALF_OPEN
+        breaker._on_success()
+        assert breaker.state == CircuitState.HALF_OPEN
+        breaker._on_success()
+        assert breaker.state == CircuitState.CLOSED
+        assert breaker.get_state()["state"] == "closed"
+
+    def test_get_state_returns_copies(self, breaker):
+        """Test callers cannot alter the cached snapshot or the config."""
+        state = breaker.get_state()
+        state["state"] = "open"
+        assert breaker.get_state()["state"] == "closed"
+
+        with pytest.raises(TypeError):
+            breaker.get_state()["config"]["failure_threshold"] = 0
+
+    def test_get_state_reuses_snapshot_on_success(self, breaker):
+        """Test a plain success refreshes only its timestamp in the cached snapshot."""
+        breaker.get_state()
+        cached = breaker._state_cache
+
+        breaker._on_success()
+        state = breaker.get_state()
+        assert breaker._state_cache is cached
+        assert state["last_success_time"] == breaker.last_success_time.isoformat()
+
+        # A failure changes the reported counts, so the snapshot is rebuilt
+        breaker._on_failure(RuntimeError("failure"))
+        state = breaker.get_state()
+        assert breaker._state_cache is not cached
+        assert state["failure_count"] == 1
+        assert state["last_failure_time"] == breaker.last_failure_time.isoformat()
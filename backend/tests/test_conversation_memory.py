@@ -3,6 +3,7 @@ import pytest
 import asyncio
 import tempfile
 import shutil
+import sqlite3
 from pathlib import Path
 from datetime import datetime, timedelta
 from unittest.mock import Mock, patch
@@ -322,6 +323,132 @@ class TestConversationMemoryManager:
         # In a real implementation, we'd check the metrics database
         state = await memory_manager.get_conversation_state(conversation_id)
         assert state.message_count == 5
+    
+    @pytest.mark.asyncio
+    async def test_transaction_commits_on_success(self, memory_manager):
+        """Test buffered writes are committed when the transaction completes."""
+        conversation_id = "test-conversation-009"
+        
+        async with memory_manager._transaction(conversation_id):
+            await memory_manager.initialize_conversation(conversation_id)
+        
+        state = await memory_manager._load_conversation_state(conversation_id)
+        assert state is not None
+        assert state.conversation_id == conversation_id
+    
+    @pytest.mark.asyncio
+    async def test_transaction_discards_on_error(self, memory_manager):
+        """Test buffered writes are discarded when the transaction raises."""
+        conversation_id = "test-conversation-010"
+        
+        with pytest.raises(RuntimeError, match="turn failed"):
+            async with memory_manager._transaction(conversation_id):
+                await memory_manager.initialize_conversation(conversation_id)
+                raise RuntimeError("turn failed")
+        
+        assert await memory_manager._load_conversation_state(conversation_id) is None
+        assert await memory_manager.get_conversation_state(conversation_id) is None
+    
+    @pytest.mark.asyncio
+    async def test_transaction_reads_buffered_writes(self, memory_manager):
+        """Test reads inside a transaction see its uncommitted writes."""
+        conversation_id = "test-conversation-011"
+        relevance = MessageRelevance(message_id="msg-001", base_relevance=0.7, current_relevance=0.7)
+        
+        with pytest.raises(RuntimeError):
+            async with memory_manager._transaction(conversation_id):
+                await memory_manager._save_message_relevance(conversation_id, relevance)
+                relevances = await memory_manager._get_message_relevances_for_conversation(conversation_id)
+                assert [r.message_id for r in relevances] == ["msg-001"]
+                raise RuntimeError("turn failed")
+        
+        # The discarded write is neither stored nor cached
+        assert await memory_manager._get_message_relevances_for_conversation(conversation_id) == []
+    
+    @pytest.mark.asyncio
+    async def test_transaction_stores_state_as_saved(self, memory_manager):
+        """Test a buffered state write keeps the state as it was when saved."""
+        conversation_id = "test-conversation-013"
+        
+        async with memory_manager._transaction(conversation_id):
+            state = await memory_manager.initialize_conversation(conversation_id)
+            state.message_count = 42
+            await memory_manager._save_conversation_state(state)
+            # Changed after the save and never saved again
+            state.message_count = 99
+        
+        stored = await memory_manager._load_conversation_state(conversation_id)
+        assert stored.message_count == 42
+    
+    @pytest.mark.asyncio
+    async def test_pruning_skips_archived_messages(self, memory_manager):
+        """Test only messages still in the context window are selected for pruning."""
+        conversation_id = "test-conversation-014"
+        for message_id in ("msg-archived", "msg-active"):
+            await memory_manager._save_message_relevance(conversation_id, MessageRelevance(
+                message_id=message_id,
+                base_relevance=0.2,
+                current_relevance=0.2,
+                priority=MemoryPriority.LOW,
+                token_count=40
+            ))
+        
+        pruned = await memory_manager._select_messages_to_prune(conversation_id, ["msg-active"], 1000)
+        assert pruned == [("msg-active", 40)]
+    
+    def test_rowid_tables_are_rebuilt(self, temp_storage, memory_config):
+        """Test tables from older databases are rebuilt WITHOUT ROWID, keeping their rows."""
+        db_dir = Path(temp_storage) / "conversation_memory"
+        db_dir.mkdir()
+        with sqlite3.connect(db_dir / "conversation_memory.db") as conn:
+            conn.execute("""
+                CREATE TABLE message_relevance (
+                    message_id TEXT PRIMARY KEY,
+                    conversation_id TEXT,
+                    base_relevance REAL DEFAULT 1.0,
+                    current_relevance REAL DEFAULT 1.0,
+                    decay_factor REAL DEFAULT 1.0,
+                    last_updated TIMESTAMP,
+                    topic_relevance TEXT,
+                    priority TEXT DEFAULT 'medium',
+                    access_count INTEGER DEFAULT 0,
+                    last_accessed TIMESTAMP,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            conn.execute("""
+                INSERT INTO message_relevance (message_id, conversation_id, current_relevance)
+                VALUES ('msg-001', 'conv', 0.5)
+            """)
+        
+        manager = ConversationMemoryManager(storage_path=temp_storage, config=memory_config)
+        try:
+            with sqlite3.connect(manager.db_path) as conn:
+                (create_sql,) = conn.execute(
+                    "SELECT sql FROM sqlite_master WHERE name = 'message_relevance'"
+                ).fetchone()
+                rows = conn.execute("SELECT message_id, current_relevance FROM message_relevance").fetchall()
+            assert create_sql.endswith("WITHOUT ROWID")
+            assert rows == [("msg-001", 0.5)]
+        finally:
+            manager.close()
+    
+    @pytest.mark.asyncio
+    async def test_initialize_conversation_is_atomic(self, memory_manager):
+        """Test a failed metrics write also rolls back the conversation state."""
+        conversation_id = "test-conversation-012"
+        
+        async def failing_metrics_save(metrics):
+            def _db_operation(conn):
+                conn.execute("INSERT INTO missing_table VALUES (1)")
+            await memory_manager._write(metrics.conversation_id, "memory_metrics", _db_operation)
+        
+        with patch.object(memory_manager, "_save_memory_metrics", failing_metrics_save):
+            with pytest.raises(sqlite3.OperationalError):
+                await memory_manager.initialize_conversation(conversation_id)
+        
+        assert await memory_manager._load_conversation_state(conversation_id) is None
+        assert await memory_manager.get_conversation_state(conversation_id) is None
 
 class TestConversationMemoryIntegration:
     """Integration tests for conversation memory with chat service."""
@@ -0,0 +1,79 @@
+"""Tests for batched file validation in the document tool factory."""
+import pytest
+
+pytest.importorskip("crewai")
+
+from backend.core.config import get_settings
+from backend.core.processing.document_tool_factory import DocumentToolFactory
+
+class TestValidateFilesBatch:
+    """Test suite for DocumentToolFactory.validate_files_batch."""
+
+    @pytest.fixture
+    def upload_dir(self, tmp_path, monkeypatch):
+        """Create frontend and backend upload directories with a few documents."""
+        monkeypatch.chdir(tmp_path)
+        frontend = tmp_path / "frontend" / "uploads"
+        (frontend / "sub").mkdir(parents=True)
+        (frontend / "notes.txt").write_text("notes")
+        (frontend / "sub" / "guide.pdf").write_text("guide")
+        (frontend / "folder.md").mkdir()
+
+        backend = tmp_path / "uploads"
+        backend.mkdir()
+        (backend / "readme.md").write_text("readme")
+        (backend / "image.xyz").write_text("image")
+        monkeypatch.setattr(get_settings(), "upload_base_dir", str(backend))
+        return backend
+
+    @pytest.fixture
+    def factory(self, upload_dir):
+        """Create a factory resolving paths against the temporary uploads."""
+        return DocumentToolFactory()
+
+    @pytest.mark.asyncio
+    async def test_batch_matches_single_file_validation(self, factory, upload_dir):
+        """Test the batch gives the same answer as validating each file alone."""
+        file_paths = [
+            "notes.txt",
+            "sub/guide.pdf",
+            "readme.md",
+            "image.xyz",
+            "missing.txt",
+            "folder.md",
+            "../etc/passwd",
+            str(upload_dir / "readme.md"),
+            str(upload_dir / "missing.txt"),
+        ]
+
+        results = await factory.validate_files_batch(file_paths)
+
+        assert results == {
+            "notes.txt": True,
+            "sub/guide.pdf": True,
+            "readme.md": True,
+            "image.xyz": False,
+            "missing.txt": False,
+            "folder.md": False,
+            "../etc/passwd": False,
+            str(upload_dir / "readme.md"): True,
+            str(upload_dir / "missing.txt"): False,
+        }
+        for file_path, valid in results.items():
+            assert await factory.validate_file_access(file_path) == valid
+
+    @pytest.mark.asyncio
+    async def test_each_directory_listed_once(self, factory, monkeypatch):
+        """Test candidate directories are scanned once per batch."""
+        listed = []
+        list_directory = DocumentToolFactory._list_directory
+
+        def record(directory):
+            listed.append(directory)
+            return list_directory(directory)
+
+        monkeypatch.setattr(factory, "_list_directory", record)
+        results = await factory.validate_files_batch(["readme.md", "missing.txt", "image.xyz"])
+
+        assert results == {"readme.md": True, "missing.txt": False, "image.xyz": False}
+        assert sorted(map(str, listed)) == sorted(str(path) for path in factory._upload_search_dirs())
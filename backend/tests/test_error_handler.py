@@ -0,0 +1,120 @@
+"""Tests for the analysis failure handler's bookkeeping."""
+import dataclasses
+import time
+
+import pytest
+
+from backend.core.error_handling import error_handler
+from backend.core.error_handling.error_handler import (
+    AnalysisFailureHandler, InterventionPriority, InterventionStatus
+)
+from backend.exceptions.analysis_exceptions import FileAccessError, FallbackExhaustionError
+
+class TestAnalysisFailureHandler:
+    """Test suite for AnalysisFailureHandler."""
+
+    @pytest.fixture
+    def handler(self):
+        """Create a fresh failure handler."""
+        return AnalysisFailureHandler()
+
+    def test_error_patterns_are_immutable(self, handler):
+        """Test the pattern table cannot be altered through a task."""
+        pattern = handler._error_patterns["FILE_ACCESS_ERROR"]
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            pattern.priority = InterventionPriority.CRITICAL
+
+        report = handler.handle_failure(FallbackExhaustionError("doc.pdf", ["PDFSearchTool"]))
+        task = next(iter(handler.intervention_tasks.values()))
+        assert task.failure_report is report
+        task.resolution_steps.append("Extra step")
+
+        # Each task gets its own copy of the pattern's steps
+        assert "Extra step" not in handler._error_patterns["FALLBACK_EXHAUSTION"].resolution_steps
+
+    def test_escalation_counts_failures_in_window(self, handler):
+        """Test a task is created once enough failures of a code fall in the window."""
+        # FILE_ACCESS_ERROR escalates on its third recent failure
+        handler.handle_failure(FileAccessError("a.txt", "denied"))
+        handler.handle_failure(FileAccessError("b.txt", "denied"))
+        assert not handler.intervention_tasks
+
+        # Failures older than the window no longer count
+        timestamps = handler._recent_by_code["FILE_ACCESS_ERROR"]
+        for index in range(len(timestamps)):
+            timestamps[index] -= error_handler.ESCALATION_WINDOW_SECONDS + 1
+        handler.handle_failure(FileAccessError("c.txt", "denied"))
+        assert not handler.intervention_tasks
+        assert handler._count_recent_failures("FILE_ACCESS_ERROR") == 1
+
+        handler.handle_failure(FileAccessError("d.txt", "denied"))
+        handler.handle_failure(FileAccessError("e.txt", "denied"))
+        assert len(handler.intervention_tasks) == 1
+
+    def test_failure_reports_are_capped(self, handler, monkeypatch):
+        """Test the oldest failure reports are evicted at the limit."""
+        monkeypatch.setattr(error_handler, "MAX_FAILURE_REPORTS", 3)
+        reports = [handler.handle_failure(ValueError(f"failure {i}")) for i in range(5)]
+
+        assert list(handler.failure_reports) == [report.error_id for report in reports[2:]]
+        # Evicted reports also leave the escalation window
+        assert handler._count_recent_failures("UNKNOWN_ERROR") == 3
+
+    @pytest.mark.asyncio
+    async def test_cleanup_scheduled_only_for_expired_reports(self, handler, monkeypatch):
+        """Test cleanup near the limit is only scheduled once a report has expired."""
+        monkeypatch.setattr(error_handler, "MAX_FAILURE_REPORTS", 4)
+        for i in range(4):
+            handler.handle_failure(ValueError(f"failure {i}"))
+        assert handler._cleanup_task is None
+
+        # The oldest report is evicted by the next insert, so age two of them
+        expired = time.time() - (error_handler.RECORD_RETENTION_DAYS + 1) * 86400
+        first, second = list(handler.failure_reports.values())[:2]
+        first.ts_epoch = second.ts_epoch = expired
+        handler.handle_failure(ValueError("failure 4"))
+        assert handler._cleanup_task is not None
+
+        await handler._cleanup_task
+        assert second.error_id not in handler.failure_reports
+        assert len(handler.failure_reports) == 3
+
+    def test_closed_tasks_are_evicted_first(self, handler, monkeypatch):
+        """Test closed tasks make room for new ones and open tasks are never dropped."""
+        monkeypatch.setattr(error_handler, "MAX_INTERVENTION_TASKS", 2)
+        for i in range(2):
+            handler.handle_failure(ValueError(f"failure {i}"))
+        first_id, second_id = list(handler.intervention_tasks)
+        handler.update_intervention_status(first_id, InterventionStatus.RESOLVED)
+
+        handler.handle_failure(ValueError("failure 2"))
+        assert first_id not in handler.intervention_tasks
+        assert second_id in handler.intervention_tasks
+        assert len(handler.intervention_tasks) == 2
+
+        # Every remaining task is open, so the next one is refused
+        report = handler.handle_failure(ValueError("failure 3"))
+        assert handler.create_manual_intervention_task(report) is None
+        assert second_id in handler.intervention_tasks
+        assert len(handler.intervention_tasks) == 2
+        assert report.error_id in handler.failure_reports
+
+    def test_to_dict_returns_copies(self, handler):
+        """Test mutating a returned dict does not change later results."""
+        report = handler.handle_failure(FallbackExhaustionError("doc.pdf", ["PDFSearchTool"]))
+        task = next(iter(handler.intervention_tasks.values()))
+
+        report_dict = report.to_dict()
+        report_dict["message"] = "changed"
+        task_dict = task.to_dict()
+        task_dict["status"] = "changed"
+        task_dict["failure_report"]["message"] = "changed"
+
+        assert report.to_dict()["message"] != "changed"
+        assert task.to_dict()["status"] == InterventionStatus.PENDING
+        assert task.to_dict()["failure_report"]["message"] == report.message
+
+        # A report updated after the task's dict was built is not stale
+        report.stack_trace = "Traceback"
+        report.invalidate_cache()
+        assert task.to_dict()["failure_report"]["stack_trace"] == "Traceback"
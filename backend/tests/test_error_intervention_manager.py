@@ -0,0 +1,116 @@
+"""Tests for the error intervention manager's indexes and task writer."""
+import json
+
+import pytest
+
+from backend.core.config import get_settings
+from backend.core.error_handling import error_intervention_manager
+from backend.core.error_handling.error_intervention_manager import (
+    ErrorInterventionManager, InterventionPriority, InterventionStatus
+)
+
+class TestErrorInterventionManager:
+    """Test suite for ErrorInterventionManager."""
+
+    @pytest.fixture
+    def manager(self, tmp_path, monkeypatch):
+        """Create a manager storing its tasks under a temporary directory."""
+        monkeypatch.setattr(get_settings(), "upload_base_dir", str(tmp_path))
+        return ErrorInterventionManager()
+
+    @pytest.fixture
+    def batches(self, manager):
+        """Record every batch handed to the writer thread."""
+        recorded = []
+        write_task_files = manager._write_task_files
+
+        def record(payloads):
+            recorded.append(dict(payloads))
+            write_task_files(payloads)
+
+        manager._write_task_files = record
+        return recorded
+
+    async def _fail(self, manager, request_id, error):
+        return await manager.handle_analysis_failure(request_id, error, "doc.pdf", {})
+
+    @pytest.mark.asyncio
+    async def test_updates_coalesce_into_one_write(self, manager, batches):
+        """Test rapid updates of one task are written once, as the latest state."""
+        task = await self._fail(manager, "req-1", ValueError("failure"))
+        await manager.update_task_status(task.id, InterventionStatus.IN_PROGRESS, assigned_to="alice")
+        await manager.escalate_task(task.id, "still failing")
+        await manager.close()
+
+        assert batches == [{task.id: batches[0][task.id]}]
+        stored = json.loads((manager.intervention_dir / f"{task.id}.json").read_text())
+        assert stored["status"] == InterventionStatus.ESCALATED
+        assert stored["assigned_to"] == "alice"
+        assert stored["escalation_count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_writes_are_batched(self, manager, batches, monkeypatch):
+        """Test queued tasks are flushed in batches of at most WRITE_BATCH_SIZE."""
+        monkeypatch.setattr(error_intervention_manager, "WRITE_BATCH_SIZE", 2)
+        tasks = [await self._fail(manager, f"req-{i}", ValueError("failure")) for i in range(5)]
+        await manager.close()
+
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+        assert {task.id for task in tasks} == {task_id for batch in batches for task_id in batch}
+        assert len(list(manager.intervention_dir.glob("*.json"))) == 5
+
+    @pytest.mark.asyncio
+    async def test_stored_payload_is_a_snapshot(self, manager):
+        """Test changes made after a store do not leak into the queued write."""
+        task = await self._fail(manager, "req-1", ValueError("failure"))
+        task.resolution_notes = "changed after store"
+        await manager.close()
+
+        stored = json.loads((manager.intervention_dir / f"{task.id}.json").read_text())
+        assert "resolution_notes" not in stored
+
+    @pytest.mark.asyncio
+    async def test_request_id_returns_oldest_active_task(self, manager):
+        """Test lookups by request id return the oldest task still active."""
+        first = await self._fail(manager, "req-1", ValueError("first"))
+        second = await self._fail(manager, "req-1", ValueError("second"))
+        other = await self._fail(manager, "req-2", ValueError("other"))
+        assert manager.get_task_by_request_id("req-1") is first
+        assert manager.get_task_by_request_id("req-2") is other
+
+        await manager.update_task_status(first.id, InterventionStatus.RESOLVED)
+        assert manager.get_task_by_request_id("req-1") is second
+
+        await manager.update_task_status(second.id, InterventionStatus.CANCELLED)
+        assert manager.get_task_by_request_id("req-1") is None
+        assert "req-1" not in manager._by_request_id
+        await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_active_tasks_ordered_by_priority(self, manager):
+        """Test active tasks are listed from CRITICAL down to LOW."""
+        low = await self._fail(manager, "req-1", ValueError("failure"))
+        medium = await self._fail(manager, "req-2", PermissionError("denied"))
+        high = await self._fail(manager, "req-3", ValueError("gemini rate limit"))
+        critical = await self._fail(manager, "req-4", MemoryError("out of memory"))
+
+        assert manager.get_active_tasks() == [critical, high, medium, low]
+        assert manager.get_active_tasks(InterventionPriority.MEDIUM) == [medium]
+
+        await manager.update_task_status(high.id, InterventionStatus.RESOLVED)
+        assert manager.get_active_tasks() == [critical, medium, low]
+        assert manager.get_active_tasks(InterventionPriority.HIGH) == []
+        await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_escalation_moves_priority_bucket(self, manager):
+        """Test an escalated task is listed under its new priority."""
+        low = await self._fail(manager, "req-1", ValueError("failure"))
+        medium = await self._fail(manager, "req-2", PermissionError("denied"))
+
+        assert await manager.escalate_task(low.id, "no response")
+        assert low.priority == InterventionPriority.MEDIUM
+        assert manager.get_active_tasks(InterventionPriority.LOW) == []
+        assert {task.id for task in manager.get_active_tasks(InterventionPriority.MEDIUM)} == {low.id, medium.id}
+        assert manager.get_intervention_statistics()["priority_distribution"]["medium"] == 2
+        await manager.close()
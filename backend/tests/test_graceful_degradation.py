@@ -0,0 +1,60 @@
+"""Tests for the graceful degradation service's manual queue."""
+import pytest
+
+from backend.core.config import get_settings
+from backend.core.error_handling.circuit_breaker import reset_circuit_breaker_manager
+from backend.core.error_handling.error_handler import reset_error_handler
+from backend.core.error_handling.error_intervention_manager import reset_manager
+from backend.core.error_handling.graceful_degradation import GracefulDegradationService
+
+class TestManualQueue:
+    """Test suite for the manual tagging queue."""
+
+    @pytest.fixture
+    def service(self, tmp_path, monkeypatch):
+        """Create a service backed by fresh global managers."""
+        monkeypatch.setattr(get_settings(), "upload_base_dir", str(tmp_path))
+        reset_manager()
+        reset_error_handler()
+        reset_circuit_breaker_manager()
+        yield GracefulDegradationService()
+        reset_manager()
+        reset_error_handler()
+        reset_circuit_breaker_manager()
+
+    async def _queue(self, service, request_id, error_type):
+        await service._add_to_manual_queue(request_id, "doc.pdf", error_type, {})
+
+    @pytest.mark.asyncio
+    async def test_queue_evicts_oldest_at_limit(self, service):
+        """Test the queue keeps only the newest entries up to its maximum size."""
+        service.manual_queue_max_size = 3
+        await self._queue(service, "req-1", "ConfigurationError")
+        await self._queue(service, "req-2", "LLMAPIError")
+        await self._queue(service, "req-3", "timeout")
+        await self._queue(service, "req-4", "circuit_breaker_open")
+
+        assert list(service.manual_queue) == ["req-2", "req-3", "req-4"]
+        status = service.get_manual_queue_status()
+        assert status["total_items"] == 3
+        assert status["by_priority"] == {"high": 1, "medium": 1, "low": 1}
+        assert status["oldest_item"] == service.manual_queue["req-2"]["created_at"]
+
+    @pytest.mark.asyncio
+    async def test_requeued_request_replaces_entry(self, service):
+        """Test queueing a request again replaces its entry instead of evicting others."""
+        service.manual_queue_max_size = 2
+        await self._queue(service, "req-1", "timeout")
+        await self._queue(service, "req-2", "timeout")
+        await self._queue(service, "req-1", "FallbackExhaustionError")
+
+        assert list(service.manual_queue) == ["req-2", "req-1"]
+        assert service.get_manual_queue_status()["by_priority"] == {"medium": 1, "critical": 1}
+
+    def test_empty_queue_status(self, service):
+        """Test the status of an empty queue."""
+        assert service.get_manual_queue_status() == {
+            "total_items": 0,
+            "by_priority": {},
+            "oldest_item": None
+        }